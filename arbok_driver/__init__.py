@@ -7,6 +7,7 @@ from .measurement_helpers import (
 )
 from .observable import Observable, AbstractObservable, ObservableBase
 from .arbok_driver import ArbokDriver
+from .batch_collector import BatchCollector
 from .read_sequence import ReadSequence
 from .sample import Sample
 from .measurement import Measurement
@@ -14,4 +15,7 @@ from .sequence_parameter import SequenceParameter
 from .signal import Signal
 from .sub_sequence import SubSequence
 from .sweep import Sweep
+from .wait_strategy import (
+    WaitStrategy, BackoffWaitStrategy, BlockingWaitStrategy
+)
 from . import utils
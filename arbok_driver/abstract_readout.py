@@ -49,6 +49,9 @@ class AbstractReadout(ABC):
             observable.qua_var = qua.declare(observable.qua_type)
             observable.qua_stream = qua.declare_stream(
                 adc_trace = observable.adc_trace)
+            if observable.packs_bits:
+                observable.qua_packed_var = qua.declare(int, value = 0)
+                observable.qua_pack_counter = qua.declare(int, value = 0)
 
     def qua_save_variables(self):
         """Saves the qua variables of all observables in this readout"""
@@ -57,7 +60,34 @@ class AbstractReadout(ABC):
                 logging.debug(
                     "Saving variables of observable %s on abstract readout %s",
                     observable_name, self.name)
-                qua.save(observable.qua_var, observable.qua_stream)
+                if observable.packs_bits:
+                    self._qua_save_packed_bits(observable)
+                else:
+                    qua.save(observable.qua_var, observable.qua_stream)
+
+    def _qua_save_packed_bits(self, observable) -> None:
+        """
+        Packs the bool result of the given observable into a 32-bit integer.
+        The integer is saved once it holds 32 shots or the batch is complete.
+        Shot `n` of a batch is stored in bit `n % 32` of word `n // 32`.
+
+        Args:
+            observable (AbstractObservable): Bool observable to pack
+        """
+        counter = observable.qua_pack_counter
+        packed_var = observable.qua_packed_var
+        last_shot = self.sequence.measurement.sweep_size - 1
+        qua.assign(
+            packed_var,
+            packed_var | (qua.Cast.to_int(observable.qua_var) << (counter & 31))
+            )
+        with qua.if_(((counter & 31) == 31) | (counter == last_shot)):
+            qua.save(packed_var, observable.qua_stream)
+            qua.assign(packed_var, 0)
+        with qua.if_(counter == last_shot):
+            qua.assign(counter, 0)
+        with qua.else_():
+            qua.assign(counter, counter + 1)
 
     def qua_save_streams(self):
         """Saves acquired results to qua stream"""
@@ -66,9 +96,12 @@ class AbstractReadout(ABC):
                 logging.debug(
                     "Saving streams of observable %s on abstract readout %s",
                     observable_name, self.name)
-                sweep_size = self.sequence.measurement.sweep_size
-                buffer = observable.qua_stream.buffer(sweep_size)
-                buffer.save(f"{observable.full_name}_buffer")
+                self.sequence.measurement.qua_save_batch_stream(
+                    observable.qua_stream, f"{observable.full_name}_buffer",
+                    reduction = observable.reduction,
+                    reduction_axis = observable.reduction_axis,
+                    bin_edges = observable.bin_edges,
+                    bit_packed = observable.packs_bits)
         else:
             logging.debug(
                 "NOT saving streams of abstract readout %s", self.name)
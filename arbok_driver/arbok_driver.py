@@ -127,7 +127,7 @@ class ArbokDriver(qc.Instrument):
                     qua_program, self.sample.config
                     ))
             else:
-                file.write(generate_qua_script(qua_program))
+                file.write(utils.get_qua_script(qua_program))
 
     def run_local_simulation(self, qua_program,  duration: int,
         nr_controllers: int = 1, plot = True, **kwargs):
@@ -0,0 +1,129 @@
+""" Module containing BatchCollector class """
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import logging
+
+from .wait_strategy import progress_bar_callback, ContinuousBatchCounter
+
+class BatchCollector:
+    """
+    Collects the results of all registered gettables of a measurement for one
+    batch. Instead of every gettable waiting for the batch and fetching its
+    buffer in turn, the collector waits once on the `<measurement>_shots`
+    counter and fetches all `*_buffer` result handles concurrently.
+
+    Attributes:
+        measurement (Measurement): Measurement whose gettables are collected
+        max_workers (int): Maximum number of concurrent fetches
+        batch_counter (StreamingResultFetcher): Shot counter of the measurement
+        nr_registered_results (int): Number of shots collected so far
+        nr_collected_batches (int): Number of batches collected so far
+    """
+    def __init__(self, measurement, max_workers: int | None = None):
+        """
+        Constructor method of BatchCollector
+
+        Args:
+            measurement (Measurement): Measurement to collect results from
+            max_workers (int, optional): Maximum number of threads fetching
+                results. Defaults to one thread per registered gettable
+        """
+        self.measurement = measurement
+        self.max_workers = max_workers
+        self.batch_counter = None
+        self.nr_registered_results = 0
+        self.nr_collected_batches = 0
+        self._executor = None
+
+    def reset(self) -> None:
+        """Resets all job specific attributes and shuts down the thread pool"""
+        self.batch_counter = None
+        self.nr_registered_results = 0
+        self.nr_collected_batches = 0
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+
+    def collect(self, progress_bar: tuple = None) -> dict:
+        """
+        Waits until the current batch is complete and fetches the results of
+        all registered gettables concurrently
+
+        Args:
+            progress_bar (tuple, optional): Tuple of task id and rich progress
+                instance that is updated while waiting
+
+        Returns:
+            dict: GettableParameters as keys and reshaped results as values
+        """
+        raw_results = self.collect_raw(progress_bar = progress_bar)
+        return {
+            gettable: gettable.reshape_batch(raw, batch_index)
+            for gettable, (batch_index, raw) in raw_results.items()
+        }
+
+    def collect_raw(self, progress_bar: tuple = None) -> dict:
+        """
+        Waits until the current batch is complete and fetches the flat results
+        of all registered gettables concurrently without reshaping them. This
+        allows to resume the OPX before the results are post-processed.
+
+        Args:
+            progress_bar (tuple, optional): Tuple of task id and rich progress
+                instance that is updated while waiting
+
+        Returns:
+            dict: GettableParameters as keys and tuples of batch index and flat
+                results as values
+        """
+        gettables = self.measurement.gettables
+        if self.batch_counter is None:
+            self._set_up_from_program()
+        batch_size = self.measurement.sweep_size
+        continuous_mode = self.measurement.continuous_mode
+        if continuous_mode:
+            self.batch_counter.batch_index = self.nr_collected_batches
+        batch_count = self.measurement.wait_strategy.wait(
+            batch_counter = self.batch_counter,
+            qm_job = self.measurement.driver.qm_job,
+            batch_size = batch_size,
+            wait_for_pause = not continuous_mode,
+            on_poll = progress_bar_callback(
+                progress_bar, batch_size, self.nr_registered_results)
+            )
+        if progress_bar is not None:
+            progress_bar[1].update(progress_bar[0], completed = batch_count)
+        self.nr_registered_results += batch_size
+        self.nr_collected_batches += 1
+        for gettable in gettables:
+            gettable.nr_registered_results += batch_size
+
+        logging.debug("Fetching %s gettables concurrently", len(gettables))
+        results = self._executor.map(
+            lambda gettable: gettable.fetch_raw_batch(), gettables)
+        return dict(zip(gettables, results))
+
+    def _set_up_from_program(self) -> None:
+        """
+        Sets up the shot counter, the gettables and the thread pool from the
+        running job of the measurement
+        """
+        gettables = self.measurement.gettables
+        if not gettables:
+            raise LookupError(
+                f"No gettables registered in {self.measurement.name}")
+        for gettable in gettables:
+            if gettable.buffer is None:
+                gettable._set_up_gettable_from_program()
+        batch_counter = gettables[0].batch_counter
+        if isinstance(batch_counter, ContinuousBatchCounter):
+            batch_counter = copy.copy(batch_counter)
+        self.batch_counter = batch_counter
+        if self._executor is None:
+            max_workers = self.max_workers
+            if max_workers is None:
+                max_workers = len(gettables)
+            self._executor = ThreadPoolExecutor(
+                max_workers = max(1, max_workers),
+                thread_name_prefix = f"{self.measurement.name}_fetch"
+            )
@@ -0,0 +1,171 @@
+""" Module containing BatchPipeline class """
+import logging
+import queue
+import threading
+import time
+
+class BatchPipeline:
+    """
+    Post-processes fetched OPX batches on a worker thread. The measurement
+    loop only fetches the raw buffers of a batch and hands them over to the
+    pipeline, after which the OPX can be resumed right away. Reshaping and
+    saving to the dataset happen while the OPX measures the next batch.
+    The queue between both threads is bounded, so the measurement loop blocks
+    if the worker falls behind. The queue depth and the write latency of each
+    batch are recorded.
+
+    Attributes:
+        datasaver (DataSaver): QCoDeS datasaver the results are added to
+        max_pending_batches (int): Maximum number of batches waiting in queue
+        on_batch_done (callable): Called after each saved batch
+        nr_processed_batches (int): Number of batches saved so far
+        queue_depths (list): Queue depth at the time each batch was put
+        write_latencies (list): Time in s from putting each batch into the
+            queue until it was added to the dataset
+        write_durations (list): Time in s `add_result` took for each batch
+    """
+    _STOP = object()
+
+    def __init__(
+            self,
+            datasaver,
+            max_pending_batches: int = 2,
+            on_batch_done: callable = None
+            ):
+        """
+        Constructor method of BatchPipeline
+
+        Args:
+            datasaver (DataSaver): QCoDeS datasaver to add the results to
+            max_pending_batches (int, optional): Maximum number of fetched
+                batches that are not processed yet. Defaults to 2
+            on_batch_done (callable, optional): Called without arguments
+                after each batch was added to the dataset
+        """
+        if max_pending_batches < 1:
+            raise ValueError(
+                f"max_pending_batches must be at least 1, "
+                f"got {max_pending_batches}")
+        self.datasaver = datasaver
+        self.max_pending_batches = max_pending_batches
+        self.on_batch_done = on_batch_done
+        self.nr_processed_batches = 0
+        self.queue_depths = []
+        self.write_latencies = []
+        self.write_durations = []
+        self._queue = queue.Queue(maxsize = max_pending_batches)
+        self._stop_queued = False
+        self._error = None
+        self._thread = threading.Thread(
+            target = self._run, name = "arbok_batch_pipeline", daemon = True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(raise_errors = exc_type is None)
+
+    @property
+    def nr_pending_batches(self) -> int:
+        """Number of batches waiting to be processed"""
+        ### The stop item queued by `close` is not a batch
+        return max(self._queue.qsize() - self._stop_queued, 0)
+
+    @property
+    def max_queue_depth(self) -> int:
+        """Largest number of batches waiting in the queue so far"""
+        return max(self.queue_depths, default = 0)
+
+    @property
+    def last_write_latency(self) -> float | None:
+        """Write latency of the last saved batch in s"""
+        if not self.write_latencies:
+            return None
+        return self.write_latencies[-1]
+
+    @property
+    def mean_write_latency(self) -> float | None:
+        """Mean write latency of all saved batches in s"""
+        if not self.write_latencies:
+            return None
+        return sum(self.write_latencies)/len(self.write_latencies)
+
+    def put(self, raw_results: dict, setpoint_args: list) -> None:
+        """
+        Hands a fetched batch over to the worker. Blocks if
+        `max_pending_batches` batches are already waiting.
+
+        Args:
+            raw_results (dict): GettableParameters as keys and tuples of batch
+                index and flat results as values (see `BatchCollector`)
+            setpoint_args (list): Tuples of external parameters and values the
+                batch was measured at
+
+        Raises:
+            RuntimeError: If the worker failed on a previous batch
+        """
+        self._raise_worker_error()
+        self.queue_depths.append(self.nr_pending_batches)
+        item = (raw_results, list(setpoint_args), time.perf_counter())
+        while True:
+            try:
+                self._queue.put(item, timeout = 0.1)
+                return
+            except queue.Full:
+                self._raise_worker_error()
+
+    def close(self, raise_errors: bool = True) -> None:
+        """
+        Processes all pending batches and stops the worker thread
+
+        Args:
+            raise_errors (bool, optional): Whether to raise an error of the
+                worker thread. Defaults to True
+        """
+        if self._thread.is_alive():
+            self._stop_queued = True
+            self._queue.put(self._STOP)
+            self._thread.join()
+        if raise_errors:
+            self._raise_worker_error()
+
+    def _run(self) -> None:
+        """Worker loop reshaping the batches and adding them to the dataset"""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._stop_queued = False
+                return
+            if self._error is not None:
+                ### Batches after a failure are dropped to unblock `put`
+                continue
+            try:
+                self._process(*item)
+            except Exception as exc: # pylint: disable=broad-exception-caught
+                logging.error("Processing batch failed: %s", exc)
+                self._error = exc
+
+    def _process(
+            self, raw_results: dict, setpoint_args: list, t_put: float) -> None:
+        """Reshapes the results of one batch and adds them to the dataset"""
+        result_args = [
+            (gettable, gettable.reshape_batch(raw, batch_index))
+            for gettable, (batch_index, raw) in raw_results.items()
+        ]
+        t_write = time.perf_counter()
+        self.datasaver.add_result(*result_args, *setpoint_args)
+        t_done = time.perf_counter()
+        self.write_durations.append(t_done - t_write)
+        self.write_latencies.append(t_done - t_put)
+        self.nr_processed_batches += 1
+        logging.debug(
+            "Batch %s saved after %.1f ms",
+            self.nr_processed_batches, 1e3*self.write_latencies[-1])
+        if self.on_batch_done is not None:
+            self.on_batch_done()
+
+    def _raise_worker_error(self) -> None:
+        """Raises errors of the worker thread in the calling thread"""
+        if self._error is not None:
+            raise RuntimeError("Batch post-processing failed") from self._error
@@ -1,11 +1,15 @@
 """ Module containing GettableParameter class """
 
+import math
 import time
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
 from qcodes.parameters import ParameterWithSetpoints
 
+from . import utils
+from .wait_strategy import progress_bar_callback, ContinuousBatchCounter
+
 class GettableParameter(ParameterWithSetpoints):
     """
     This is a valid Gettable not because of inheritance, but because it has the
@@ -21,22 +25,39 @@ class GettableParameter(ParameterWithSetpoints):
         qm_job (RunningQmJob): Running job on the opx to interact with
         buffer (obj): QM buffer to get results from
         buffer_val (array): flat numpy array containing results of opx fetch
+        downcast_to_float32 (bool): Whether floating point results are stored
+            as float32 instead of their native float64
+        nr_batch_buffers (int): Number of preallocated batch buffers. More
+            than one is needed if batches are post-processed asynchronously
+        observable (ObservableBase): Observable the gettable was created from
+        reduced_axis (int): Sweep axis reduced on the server or None
+        bin_centers (np.ndarray): Bin centers if the results are histograms
+        bit_packed (bool): Whether bool results are packed into 32-bit words
         shape (tuple): Shape of the setpoints array
         batch_size (tuple): Shape of one OPX batch
         count (int): Amount of successful `get` executions
     """
-    def __init__(self, name, sequence, *args, **kwargs) -> None:
+    def __init__(
+            self, name, sequence, *args, observable = None, **kwargs) -> None:
         """
         Constructor class for ReadSequence class
         Args:
             name (dict): name of the GettableParameter
             readout (Readout): Readout class summarizing data streams and variables
+            observable (ObservableBase, optional): Observable of the gettable
         """
         super().__init__(name, *args, **kwargs)
         self.unit = ""
         self.label = ""
 
         self.sequence = sequence
+        self.observable = observable
+        self.reduced_axis = None
+        self.bin_centers = None
+        self.bit_packed = False
+        self.index_maps = None
+        self.downcast_to_float32 = False
+        self.nr_batch_buffers = 1
         self.reset_measuerement_attributes()
 
     def set_raw(self, *args, **kwargs) -> None:
@@ -53,6 +74,14 @@ class GettableParameter(ParameterWithSetpoints):
         self.result_nr = 0
         self.batch_counter = None
         self.nr_registered_results = 0
+        self._reset_batch_buffers()
+
+    def _reset_batch_buffers(self):
+        """Drops the batch buffers of the previous job"""
+        self.nr_fetched_batches = 0
+        self._batch_buffers = {}
+        self._unfolded_buffer = None
+        self._previous_histogram = None
 
     def get_raw(self, progress_bar = None) -> np.ndarray:
         """ 
@@ -67,51 +96,72 @@ class GettableParameter(ParameterWithSetpoints):
 
         ### The progress is being tracked while waiting for the buffer to fill
         self._wait_until_buffer_full(progress_bar = progress_bar)
+        return self.fetch_batch()
+
+    def fetch_batch(self, copy: bool = True) -> np.ndarray:
+        """
+        Fetches the current batch from the OPX buffer and reshapes it to the
+        sweep shape. Does not wait for the batch to be complete, which is
+        either done in `get_raw` or by the `BatchCollector` of the measurement
+
+        Args:
+            copy (bool): Whether a new array is returned. Otherwise the result
+                is a view into buffers that are overwritten by later fetches
+
+        Returns:
+            np.ndarray: The batch in the shape of the sweeps
+        """
+        batch_index, buffer_val = self.fetch_raw_batch()
+        batch = self.reshape_batch(buffer_val, batch_index)
+        if copy:
+            return batch.copy()
+        return batch
+
+    def fetch_raw_batch(self) -> tuple[int, np.ndarray]:
+        """
+        Fetches the current batch from the OPX buffer without reshaping it.
+        The returned array stays valid until `nr_batch_buffers` further
+        batches have been fetched.
+
+        Returns:
+            int: Index of the fetched batch
+            np.ndarray: Flat array with the results of the batch
+        """
+        batch_index = self.nr_fetched_batches
         self.buffer_val = self._fetch_opx_buffer()
 
         ### The QM can have a delay in populating the stream for big sweeps
-        while not self.buffer_val.shape == (self.sequence.sweep_size,):
+        while self.buffer_val is None:
             time.sleep(0.1)
             self.buffer_val = self._fetch_opx_buffer()
-        return self._reshape_data(self.buffer_val, self.shape, self.snaked)
+        self.nr_fetched_batches += 1
+        return batch_index, self.buffer_val
 
-    def _reshape_data(self, a_in: np.ndarray, sizes: tuple[int, ...], snaked: tuple[bool, ...]) -> np.ndarray:
+    def reshape_batch(self, a_in: np.ndarray, batch_index: int) -> np.ndarray:
         """
-        Reshape the inherited array to be len(sizes). Iterate through each of the sizes gradually
-        reshaping the inherited array one dimensions at a time. If for dimension n, snaked[n] is true,
-        then reverse every second row of that dimension, then iterate to the next dimension.
+        Reshapes the flat OPX buffer to the shape of the sweeps. Snaked sweeps
+        are unfolded with the index maps precomputed by the measurement in a
+        single gather into a reused output buffer.
 
         Args:
-            a_in (np.ndarray): The input array to be reshaped.
-            sizes (Tuple[int, ...]): The target shape dimensions.
-            snaked (Tuple[bool, ...]): A tuple indicating which dimensions should have every second row reversed.
+            a_in (np.ndarray): The flat input array to be reshaped
+            batch_index (int): Index of the batch (direction of outer snakes)
 
         Returns:
-            np.ndarray: The reshaped array with specified dimensions and reversed rows as needed
+            np.ndarray: The reshaped array with unfolded snake scans
         """
-
-        # First check that the cumulative product of sizes is the same as self.size
-        if np.prod(sizes) != a_in.size:
-            raise ValueError(f"""The cumulative product of sizes {np.prod(sizes)} must be equal to the 
-                             total number of elements in the array {self.size}.""")
-
-        # Duplicate the ndarray
-        a = a_in
-
-        # Now iterate through each of the sizes
-        for i, (sz, sn) in enumerate(zip(sizes[:-1], snaked[1:])):
-            # Reshape a to have an extra dimension of size sz
-            if i < len(sizes)-1:
-                new_shape = a.shape[:-1] + (sz, -1)
-                a = a.reshape(new_shape)
-
-                # If sn is true, then reverse every second innermost row
-                if sn:
-                    if i == 0: # For the first dimension, reverse elements of even rows
-                        a[1::2] = np.flip(a[1::2], axis=-1)
-                    else:      # For subsequent dimensions, reverse every second innermost row (like before)
-                        a[:, 1::2] = np.flip(a[:, 1::2], axis=-1)
-        return a
+        if a_in.size != self.result_size:
+            raise ValueError(
+                f"The size of the array {a_in.size} must be equal to the "
+                f"result size {self.result_size}")
+        if self.index_maps is None:
+            return a_in.reshape(self.shape)
+        index_map = self.index_maps[batch_index % 2]
+        if self._unfolded_buffer is None or (
+                self._unfolded_buffer.dtype != a_in.dtype):
+            self._unfolded_buffer = np.empty(a_in.size, dtype = a_in.dtype)
+        np.take(a_in, index_map, out = self._unfolded_buffer)
+        return self._unfolded_buffer.reshape(self.shape)
 
     def _set_up_gettable_from_program(self):
         """
@@ -126,62 +176,131 @@ class GettableParameter(ParameterWithSetpoints):
             self.qm_job.result_handles,
             f"{self.sequence.name}_shots"
         )
+        if self.sequence.continuous_mode:
+            self.batch_counter = ContinuousBatchCounter(
+                shot_counter = self.batch_counter,
+                batch_counter = getattr(
+                    self.qm_job.result_handles,
+                    f"{self.sequence.name}_batches"
+                ),
+                batch_size = self.sequence.sweep_size
+            )
         self.buffer = getattr(self.qm_job.result_handles, f"{self.name}_buffer")
         if self.buffer is None:
             raise LookupError(
                 f"Buffer {self.name}_buffer not found. Try one of:"
                 f"{self.qm_job.result_handles.keys()}")
-        self.shape = tuple(reversed(tuple(sweep.length for sweep in self.sequence.sweeps)))
-        self.snaked = tuple(reversed(tuple(sweep.snake_scan for sweep in self.sequence.sweeps)))
+        shape = tuple(reversed(tuple(s.length for s in self.sequence.sweeps)))
+        if self.reduced_axis is not None:
+            shape = shape[:self.reduced_axis] + shape[self.reduced_axis + 1:]
+        if self.bin_centers is not None:
+            shape = self.bin_centers.shape
+        self.shape = shape
         self.batch_size = self.sequence.sweep_size
 
+    @property
+    def result_size(self) -> int:
+        """Number of values per batch after the reduction on the server"""
+        if self.shape is None:
+            return self.batch_size
+        return math.prod(self.shape)
+
+    @property
+    def fetch_size(self) -> int:
+        """Number of values per batch in the result stream on the server"""
+        if self.bit_packed:
+            return utils.get_nr_packed_words(self.result_size)
+        return self.result_size
+
     def _wait_until_buffer_full(self, progress_bar = None):
         """
-        This function is running until a batch with self.batch_size is ready
-        """
-        batch_count, old_count = 0, 0
-        last_result_nr = self.result_nr
-        time_per_shot = 0
-        shot_timing = "Calculate timing...\n"
-        total_results = "Total results: ..."
-        t0 = time.time()
-        try:
-            # self.qm_job.resume()
-            while batch_count < self.batch_size or not self.qm_job.is_paused():
-                logging.debug(
-                    "Waiting for buffer to fill (%s/%s), %s",
-                    batch_count, self.batch_size, self.qm_job.is_paused()
-                    )
-                shot_count_result = self.batch_counter.fetch_all()
-                if shot_count_result is not None:
-                    batch_count = shot_count_result[0]
-                    total_nr_results = batch_count + self.nr_registered_results
-                    total_results = f"Total results: {total_nr_results}"
-                if progress_bar is not None:
-                    bar_title = "[cyan]Batch progress "
-                    bar_title += f"{batch_count}/{self.batch_size}\n"
-                    if batch_count > 0:
-                        time_per_shot = 1e3*(time.time()-t0)/(batch_count)
-                    shot_timing = f"{time_per_shot:.1f} ms per shot\n"
-                    progress_bar[1].update(
-                        progress_bar[0],
-                        completed = batch_count,
-                        description = bar_title + shot_timing + total_results
-                    )
-                    progress_bar[1].refresh()
-        except KeyboardInterrupt as exc:
-            raise KeyboardInterrupt('Measurement interrupted by user') from exc
+        Waits until a batch with self.batch_size is ready. The waiting is done
+        by the `WaitStrategy` of the measurement which limits the poll rate
+        """
+        continuous_mode = self.sequence.continuous_mode
+        if continuous_mode:
+            self.batch_counter.batch_index = self.nr_fetched_batches
+        batch_count = self.sequence.wait_strategy.wait(
+            batch_counter = self.batch_counter,
+            qm_job = self.qm_job,
+            batch_size = self.batch_size,
+            wait_for_pause = not continuous_mode,
+            on_poll = progress_bar_callback(
+                progress_bar, self.batch_size, self.nr_registered_results)
+            )
         if progress_bar is not None:
             progress_bar[1].update(progress_bar[0], completed = batch_count)
         self.nr_registered_results += self.batch_size
 
-    def _fetch_opx_buffer(self):
+    def _fetch_opx_buffer(self) -> np.ndarray | None:
         """
-        Fetches the OPX buffer into the `buffer_val` and increments the internal
-        counter `count`
+        Fetches the OPX buffer and copies it once into a preallocated batch
+        buffer. In continuous mode the batch is fetched by its index from the
+        `save_all` result handle. The native dtype of the stream is kept (e.g
+        int or bool) unless `downcast_to_float32` is set for floats. The
+        batch buffers are used as a ring of `nr_batch_buffers` slots.
+
+        Returns:
+            np.ndarray | None: The batch buffer or None if the stream does not
+                hold a complete batch yet
+        """
+        if self.bin_centers is not None and (
+                self.buffer.count_so_far() <= self.nr_fetched_batches):
+            ### Histograms always have the full size. The one of this batch is
+            ### only complete once the server emitted it on the stream
+            return None
+        if self.sequence.continuous_mode:
+            buffer_val = self.buffer.fetch(
+                self.nr_fetched_batches, flat_struct = True)
+        else:
+            buffer_val = self.buffer.fetch_all()
+        if buffer_val is None or buffer_val.size != self.fetch_size:
+            return None
+        if self.bit_packed:
+            buffer_val = utils.unpack_bits(buffer_val, self.result_size)
+        slot = self.nr_fetched_batches % self.nr_batch_buffers
+        dtype = self._get_buffer_dtype(buffer_val)
+        batch_buffer = self._batch_buffers.get(slot)
+        if batch_buffer is None or batch_buffer.size != self.result_size or (
+                batch_buffer.dtype != dtype):
+            batch_buffer = np.empty(self.result_size, dtype = dtype)
+            self._batch_buffers[slot] = batch_buffer
+        np.copyto(
+            batch_buffer, np.reshape(buffer_val, -1), casting = 'same_kind')
+        if self.bin_centers is not None:
+            self._subtract_previous_histogram(batch_buffer)
+        return batch_buffer
+
+    def _subtract_previous_histogram(self, batch_buffer: np.ndarray) -> None:
         """
-        buffer_val = np.array(self.buffer.fetch_all(), dtype = float)
-        return buffer_val
+        Histograms on the server count all shots since the start of the
+        program. The counts of the batch are obtained in place by subtracting
+        the histogram of the previous batch. At most `batch_size` shots can be
+        added per batch, fewer if shots fell outside of the bins.
+
+        Raises:
+            RuntimeError: If the counts of the batch are negative or exceed the
+                batch size, i.e the histograms are not consecutive
+        """
+        histogram = batch_buffer.copy()
+        if self._previous_histogram is not None:
+            batch_buffer -= self._previous_histogram
+        nr_counts = int(batch_buffer.sum())
+        if np.any(batch_buffer < 0) or nr_counts > self.batch_size:
+            raise RuntimeError(
+                f"Histogram of {self.name} grew by {nr_counts} counts in batch "
+                f"{self.nr_fetched_batches}, expected {self.batch_size}")
+        if nr_counts < self.batch_size:
+            logging.debug(
+                "%s shots of %s outside of histogram bins",
+                self.batch_size - nr_counts, self.name)
+        self._previous_histogram = histogram
+
+    def _get_buffer_dtype(self, buffer_val: np.ndarray) -> np.dtype:
+        """Returns the dtype of the batch buffer for the fetched stream"""
+        if self.downcast_to_float32 and buffer_val.dtype.kind == 'f':
+            return np.dtype(np.float32)
+        return buffer_val.dtype
 
     def reset(self):
         """Resets all job specific attributes"""
@@ -191,6 +310,7 @@ class GettableParameter(ParameterWithSetpoints):
         self.shape = None
         self.batch_size = 0
         self.result_nr = 0
+        self._reset_batch_buffers()
 
     def plot_set_current_histogram(self, *args, **kwargs) -> tuple:
         """
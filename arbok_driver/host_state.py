@@ -0,0 +1,121 @@
+""" Module containing HostState class """
+import logging
+
+from .sequence_parameter import SequenceParameter
+
+QUA_TYPE_NAMES = ('int', 'bool', 'fixed')
+
+class HostState:
+    """
+    Records the QUA variables and streams that are stored on host objects
+    while a QUA program is generated, e.g `param.qua_var` or the shot tracker
+    of the measurement. A cached program can only be reused if these
+    references are restored to the ones declared in that program.
+
+    Only the attributes owned by the program generation are recorded, i.e
+    the ones listed in the class attributes below and the values of
+    parameters that were set to QUA variables. Objects are identified by the
+    full name of parameters, the name of gettables and the index of sweeps.
+    Hence the state can be restored onto sweeps that were replaced by
+    `set_sweeps` in the meantime.
+
+    Attributes:
+        changes (dict): Recorded attributes by the key of their host object
+        parameter_values (dict): QUA variables by the full name of the
+            parameter holding them as value
+    """
+    measurement_attributes = (
+        'shot_tracker_qua_var', 'shot_tracker_qua_stream',
+        'batch_tracker_qua_var', 'batch_tracker_qua_stream',
+        *(f"_qua_{name}_input_stream" for name in QUA_TYPE_NAMES),
+        *(f"_qua_{name}_live_stream" for name in QUA_TYPE_NAMES),
+        *(f"debug_{name}_input_stream" for name in QUA_TYPE_NAMES),
+    )
+    parameter_attributes = (
+        'qua_var', 'qua_sweeped', 'qua_sweep_arr', 'qua_sweep_source',
+        'input_stream'
+    )
+    observable_attributes = (
+        'qua_var', 'qua_stream', 'qua_buffer', 'qua_packed_var',
+        'qua_pack_counter'
+    )
+    sweep_attributes = ('sweep_snake_var',)
+
+    def __init__(self, measurement) -> None:
+        """
+        Constructor method of HostState. Records the state of the given
+        measurement right after its program was generated
+
+        Args:
+            measurement (Measurement): Measurement the program belongs to
+        """
+        self.changes = {}
+        self.parameter_values = {}
+        for key, (obj, attributes) in self._get_host_objects(
+                measurement).items():
+            self.changes[key] = {
+                name: getattr(obj, name)
+                for name in attributes if hasattr(obj, name)
+            }
+            if isinstance(obj, SequenceParameter):
+                value = obj.cache.raw_value
+                if type(value).__module__.startswith('qm.'):
+                    self.parameter_values[key] = value
+        logging.debug(
+            "Recorded host state of %s objects and %s parameter values",
+            len(self.changes), len(self.parameter_values))
+
+    def restore(self, measurement) -> bool:
+        """
+        Applies the recorded attributes to the host objects of the given
+        measurement. Nothing is applied if any of the objects can not be found
+
+        Args:
+            measurement (Measurement): Measurement the program belongs to
+
+        Returns:
+            bool: Whether the state was restored
+        """
+        host_objects = self._get_host_objects(measurement)
+        missing = [key for key in self.changes if key not in host_objects]
+        if missing:
+            logging.debug("Host objects %s to restore not found", missing)
+            return False
+        for key, attributes in self.changes.items():
+            obj = host_objects[key][0]
+            for name, value in attributes.items():
+                setattr(obj, name, value)
+        for key, value in self.parameter_values.items():
+            host_objects[key][0].cache.set(value)
+        return True
+
+    def _get_host_objects(self, measurement) -> dict:
+        """
+        Returns all objects holding QUA variables or streams of the program
+        together with the attributes owned by the program generation
+        """
+        host_objects = {
+            ('measurement',): (measurement, self.measurement_attributes)}
+        for i, sweep in enumerate(measurement.sweeps):
+            host_objects[('sweep', i)] = (sweep, self.sweep_attributes)
+        for gettable in measurement.available_gettables:
+            observable = getattr(gettable, 'observable', None)
+            if observable is not None:
+                host_objects[('observable', gettable.name)] = (
+                    observable, self.observable_attributes)
+        for param in self._get_sequence_parameters(measurement):
+            host_objects[('parameter', param.full_name)] = (
+                param, self.parameter_attributes)
+        return host_objects
+
+    @classmethod
+    def _get_sequence_parameters(cls, module) -> list:
+        """Returns all sequence parameters of the module and its submodules"""
+        params = [
+            param for param in module.parameters.values()
+            if isinstance(param, SequenceParameter)
+        ]
+        for submodule in getattr(module, 'submodules', {}).values():
+            if hasattr(submodule, 'parameters'):
+                params.extend(cls._get_sequence_parameters(submodule))
+        return params
@@ -1,14 +1,17 @@
 """Module containing the Measurement class"""
 import math
 import copy
+import time
 import logging
 from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import numpy as np
-from qm import qua, generate_qua_script
+from qm import qua
 import qcodes as qc
 from qcodes.validators import Arrays
 
+from .batch_collector import BatchCollector
 from .measurement_helpers import create_measurement_loop
 from .gettable_parameter import GettableParameter
 from .observable import ObservableBase
@@ -17,12 +20,16 @@ from .sample import Sample
 from .sequence_base import SequenceBase
 from .sub_sequence import SubSequence
 from .sweep import Sweep
+from .wait_strategy import WaitStrategy, BackoffWaitStrategy
+from . import utils
 
 class Measurement(SequenceBase):
     """Class describing a Measurement in an OPX driver"""
     qc_experiment = None
     qc_measurement = None
     qc_measurement_name = None
+    max_pending_sweep_chunks = 2 # Chunks queued ahead of the OPX per stream
+    sweep_stream_poll_interval = 0.01 # Seconds between shot counter polls
 
     def __init__(
             self,
@@ -45,6 +52,9 @@ class Measurement(SequenceBase):
         super().__init__(parent, name, sample, conf)
         self.driver = parent
         self.measurement = self
+        self._wait_strategy = BackoffWaitStrategy()
+        self.batch_collector = BatchCollector(self)
+        self._sweep_stream_executor = None
         self._init_vars()
         self._reset_sweeps_setpoints()
         parent.add_sequence(self)
@@ -83,9 +93,12 @@ class Measurement(SequenceBase):
         self._sweep_size = 1
         self.shot_tracker_qua_var = None
         self.shot_tracker_qua_stream = None
+        self.batch_tracker_qua_var = None
+        self.batch_tracker_qua_stream = None
         self._step_requirements = []
         self._input_stream_parameters = []
         self._input_stream_type_shapes = {'int': 0, 'bool': 0, 'qua.fixed': 0}
+        self._live_parameters = []
         self._available_gettables = []
         self.debug_input_streams = False
 
@@ -109,17 +122,51 @@ class Measurement(SequenceBase):
         """Resets gettables to prepare for new measurement"""
         for gettable in self.gettables:
             gettable.reset_measuerement_attributes()
+        self.wait_strategy.reset_counters()
+        self.batch_collector.reset()
 
     @property
     def sweeps(self) -> list:
         """List of Sweep objects for `SubSequence`"""
         return self._sweeps
 
+    @property
+    def streamed_sweeps(self) -> list:
+        """Sweeps whose setpoints are fed in chunks via input streams"""
+        return [sweep for sweep in self.sweeps if sweep.chunk_size is not None]
+
     @property
     def gettables(self) -> list:
         """List of `GettableParameter`s for data acquisition"""
         return self._gettables
 
+    @property
+    def wait_strategy(self) -> WaitStrategy:
+        """Strategy used to wait for the OPX to complete a batch"""
+        return self._wait_strategy
+
+    @wait_strategy.setter
+    def wait_strategy(self, strategy: WaitStrategy) -> None:
+        """
+        Setter for the wait strategy
+
+        Raises:
+            TypeError: If strategy is not of type WaitStrategy
+        """
+        if not isinstance(strategy, WaitStrategy):
+            raise TypeError(
+                f"Wait strategy must be of type WaitStrategy, is {type(strategy)}")
+        self._wait_strategy = strategy
+
+    @property
+    def continuous_mode(self) -> bool:
+        """
+        Whether the measurement runs without pausing the OPX between batches.
+        Set via `ArbokDriver.no_pause`. In this mode all batches are saved with
+        `save_all` and are consumed by their index on the host.
+        """
+        return bool(self.driver.no_pause)
+
     @property
     def sweep_size(self) -> int:
         """Product of sweep axes sizes"""
@@ -138,6 +185,28 @@ class Measurement(SequenceBase):
         """Registered input stream parameters"""
         return self._input_stream_parameters
 
+    @property
+    def live_parameters(self) -> list:
+        """
+        Parameters that are declared as QUA variables and fed by input streams.
+        Their current values are pushed to the running job before each batch,
+        hence they can be changed via `set` without recompiling the program.
+        """
+        return self._live_parameters
+
+    @live_parameters.setter
+    def live_parameters(self, parameters: list) -> None:
+        """
+        Setter for live parameters
+
+        Raises:
+            TypeError: If not all parameters are of type SequenceParameter
+            ValueError: If not all parameters are unique scalar parameters
+        """
+        self._live_parameters = []
+        for parameter in parameters:
+            self.add_live_parameter(parameter)
+
     @property
     def step_requirements(self) -> list:
         """Registered input stream parameters"""
@@ -171,7 +240,11 @@ class Measurement(SequenceBase):
         """Contains raw QUA code to declare variables"""
         self.shot_tracker_qua_var = qua.declare(int, value = 0)
         self.shot_tracker_qua_stream = qua.declare_stream()
+        if self.continuous_mode:
+            self.batch_tracker_qua_var = qua.declare(int, value = 0)
+            self.batch_tracker_qua_stream = qua.declare_stream()
         self._qua_declare_input_streams()
+        self._qua_declare_live_streams()
 
     def qua_before_sweep(self):
         """
@@ -195,6 +268,7 @@ class Measurement(SequenceBase):
         if fixed_params:
             self._qua_advance_assign_save_input_streams(
                 'fixed', fixed_params, self._qua_fixed_input_stream, index)
+        self._qua_advance_live_streams()
 
     def _qua_advance_assign_save_input_streams(
         self, var_type, input_params, input_stream, index = None):
@@ -241,9 +315,151 @@ class Measurement(SequenceBase):
             )
         qua.save(self.shot_tracker_qua_var, self.shot_tracker_qua_stream)
 
+    def qua_increment_batch_tracker(self):
+        """
+        Increments the batch tracker variable by one and saves it to stream.
+        Marks the end of a batch in continuous mode
+        """
+        qua.assign(
+            self.batch_tracker_qua_var,
+            self.batch_tracker_qua_var + 1
+            )
+        qua.save(self.batch_tracker_qua_var, self.batch_tracker_qua_stream)
+
+    def qua_save_batch_stream(
+            self,
+            stream,
+            name: str,
+            reduction: str | None = None,
+            reduction_axis = None,
+            bin_edges: np.ndarray | None = None,
+            bit_packed: bool = False
+            ) -> None:
+        """
+        Buffers the given stream into batches of the sweep size and saves it
+        under the given name. In continuous mode all batches are kept on the
+        server (`save_all`) to be fetched by their index. If a reduction is
+        given, the batch is reduced along the given sweep axis on the server.
+        If bin edges are given, all shots of the batch are binned into a
+        histogram on the server instead. Bit packed streams hold one 32-bit
+        integer per 32 shots.
+        Only to be called within qua.stream_processing() context manager!
+
+        Args:
+            stream (qua stream): Stream containing one value per shot
+            name (str): Name of the result handle
+            reduction (str, optional): Reduction ('mean', 'sum' or 'var') along
+                the axis of `reduction_axis`. Defaults to None
+            reduction_axis (SequenceParameter, optional): Parameter swept along
+                the axis to reduce
+            bin_edges (np.ndarray, optional): Edges of the histogram bins
+            bit_packed (bool, optional): Whether the stream holds bool results
+                packed into 32-bit integers. Defaults to False
+        """
+        if bit_packed:
+            buffer = stream.buffer(utils.get_nr_packed_words(self.sweep_size))
+        elif bin_edges is not None:
+            buffer = self._qua_histogram_stream(
+                stream, bin_edges, self.sweep_size)
+        elif reduction is None:
+            buffer = stream.buffer(self.sweep_size)
+        else:
+            ### At QUA generation the last sweep is the outermost loop
+            sweeps = tuple(reversed(self.sweeps))
+            axis = self.get_reduced_axis(reduction_axis, sweeps)
+            buffer = self._qua_reduce_stream(
+                stream, reduction, tuple(s.length for s in sweeps), axis)
+        if self.continuous_mode:
+            buffer.save_all(name)
+        else:
+            buffer.save(name)
+
+    @staticmethod
+    def _qua_reduce_stream(stream, reduction: str, sizes: tuple, axis: int):
+        """
+        Reduces the batches of the given stream along the given axis using
+        QUA stream processing operators. The variance is the population
+        variance computed from the first two moments.
+
+        Args:
+            stream (qua stream): Stream containing one value per shot
+            reduction (str): Either 'mean', 'sum' or 'var'
+            sizes (tuple): Lengths of the sweep axes (outermost first)
+            axis (int): Index of the axis to reduce in `sizes`
+
+        Returns:
+            qua stream: Stream with one reduced array per batch
+        """
+        def batch_mean(stream_to_average):
+            return stream_to_average.buffer(*sizes).map(
+                qua.FUNCTIONS.average(axis))
+        mean = batch_mean(stream)
+        if reduction == 'mean':
+            return mean
+        if reduction == 'sum':
+            return mean*sizes[axis]
+        if reduction == 'var':
+            return batch_mean(stream*stream) - mean*mean
+        raise ValueError(f"Reduction {reduction} not valid")
+
+    @staticmethod
+    def _qua_histogram_stream(stream, bin_edges: np.ndarray, sweep_size: int):
+        """
+        Bins the given stream into a histogram on the server. The histogram
+        operator counts all items since the start of the program, hence only
+        the histogram after the last shot of each batch is kept. The counts of
+        the individual batches are the differences of consecutive histograms.
+
+        Args:
+            stream (qua stream): Stream containing one value per shot
+            bin_edges (np.ndarray): Increasing edges of the histogram bins
+            sweep_size (int): Number of shots in one batch
+
+        Returns:
+            qua stream: Stream with one cumulative histogram per batch
+        """
+        bins = [
+            [float(low), float(high)]
+            for low, high in zip(bin_edges[:-1], bin_edges[1:])
+        ]
+        return stream.histogram(bins).skip(sweep_size - 1).buffer_and_skip(
+            1, sweep_size)
+
+    def get_reduced_axis(self, reduction_axis, sweeps: tuple) -> int:
+        """
+        Returns the index of the sweep axis along which the given parameter is
+        swept. Reducing an axis is only possible if the next inner axis is not
+        snaked, since its direction depends on the reduced loop.
+
+        Args:
+            reduction_axis (SequenceParameter): Parameter swept on the axis
+            sweeps (tuple): Sweeps of the measurement (outermost first)
+
+        Returns:
+            int: Index of the axis in `sweeps`
+
+        Raises:
+            ValueError: If the parameter is not swept or the next inner axis is
+                snaked
+        """
+        for axis, sweep in enumerate(sweeps):
+            if reduction_axis in sweep.parameters:
+                break
+        else:
+            raise ValueError(
+                f"Reduction axis {getattr(reduction_axis, 'name', None)} is "
+                f"not swept in {self.name}")
+        if axis + 1 < len(sweeps) and self._is_snaked(sweeps[axis + 1]):
+            raise ValueError(
+                f"Can not reduce axis of {reduction_axis.name} since the next "
+                "inner sweep is snaked")
+        return axis
+
     def qua_stream(self):
         """Contains raw QUA code to define streams"""
         self.shot_tracker_qua_stream.buffer(1).save(self.name + "_shots")
+        if self.continuous_mode:
+            self.batch_tracker_qua_stream.save_all(self.name + "_batches")
         if self.debug_input_streams:
             for var_type in ['int', 'bool', 'fixed']:
                 stream_name = f"debug_{var_type}_input_stream"
@@ -340,9 +556,9 @@ class Measurement(SequenceBase):
             seq_type = 'declare', skip_duplicates = True)
 
         ### An infinite loop starting with a pause is defined to sync the
-        ### client with the QMs
+        ### client with the QMs. In continuous mode the OPX never pauses
         with qua.infinite_loop_():
-            if not simulate:
+            if not simulate and not self.continuous_mode:
                 qua.pause()
 
             ### Check requirements are set to True if the measurement is simulated
@@ -358,6 +574,8 @@ class Measurement(SequenceBase):
             ### The sweep loop is defined for each sub-sequence recursively
             self.recursive_sweep_generation(
                 copy.copy(self.sweeps))
+            if self.continuous_mode:
+                self.qua_increment_batch_tracker()
         with qua.stream_processing():
             self.recursive_qua_generation(seq_type = 'stream')
 
@@ -368,7 +586,7 @@ class Measurement(SequenceBase):
         print('QUA program compiled')
         if save_path:
             with open(save_path, 'w', encoding="utf-8") as file:
-                file.write(generate_qua_script(qua_program))
+                file.write(utils.get_qua_script(qua_program))
         print('QUA program saved')
         self.driver.run(qua_program)
         print('QUA program compiled and is running')
@@ -422,6 +640,117 @@ class Measurement(SequenceBase):
                 data = fixed_vals
             )
 
+    def feed_sweep_streams(self) -> Future:
+        """
+        Inserts the setpoint chunks of all streamed sweeps for one batch. A
+        streamed axis is repeated for every iteration of its outer sweeps.
+        The inserts are paced by the shot counter of the batch such that at
+        most `max_pending_sweep_chunks` chunks per parameter are queued ahead
+        of the OPX. The chunks that may be queued right away are inserted
+        before returning, all others on a background thread once the OPX has
+        advanced to the chunk `max_pending_sweep_chunks` before them.
+
+        Returns:
+            Future: Done once all chunks of the batch are inserted
+        """
+        window = max(int(self.max_pending_sweep_chunks), 1)
+        schedule = []
+        shots_per_setpoint = 1
+        for i, sweep in enumerate(self.sweeps):
+            if sweep.chunk_size is not None:
+                ### Outer sweeps are at the end of the sweep list
+                nr_repetitions = math.prod(s.length for s in self.sweeps[i+1:])
+                ### Shot count at which the OPX advances to each chunk
+                first_shots = [
+                    shots_per_setpoint*(rep*sweep.length + j*sweep.chunk_size)
+                    for rep in range(nr_repetitions)
+                    for j in range(sweep.nr_chunks)
+                    ]
+                for param in sweep.parameters:
+                    chunks = sweep.get_stream_chunks(param)*nr_repetitions
+                    for chunk_idx, chunk in enumerate(chunks):
+                        release_shot = -1
+                        if chunk_idx >= window:
+                            release_shot = first_shots[chunk_idx - window]
+                        schedule.append((release_shot, param, chunk))
+            shots_per_setpoint *= sweep.length
+        schedule.sort(key = lambda item: item[0])
+        nr_released = sum(1 for item in schedule if item[0] < 0)
+        stale_shot_count = None
+        if nr_released < len(schedule):
+            stale_shot_count = self._fetch_batch_shot_count()
+        for _, param, chunk in schedule[:nr_released]:
+            self._insert_sweep_chunk(param, chunk)
+        if self._sweep_stream_executor is None:
+            self._sweep_stream_executor = ThreadPoolExecutor(
+                max_workers = 1, thread_name_prefix = "arbok_sweep_stream")
+        return self._sweep_stream_executor.submit(
+            self._insert_remaining_sweep_chunks,
+            schedule[nr_released:], stale_shot_count)
+
+    def _insert_remaining_sweep_chunks(
+            self, schedule: list, stale_shot_count: int | None) -> None:
+        """
+        Inserts the scheduled chunks once the shot counter of the batch has
+        passed their release shot
+
+        Args:
+            schedule (list): Tuples of release shot, parameter and chunk sorted
+                by the release shot
+            stale_shot_count (int): Shot count before the chunks of the batch
+                were inserted. The counter keeps the count of the previous
+                batch until the first shot of this batch is saved
+        """
+        shot_count = -1
+        for release_shot, param, chunk in schedule:
+            while shot_count <= release_shot:
+                new_shot_count = self._fetch_batch_shot_count()
+                if stale_shot_count is None or (
+                        new_shot_count != stale_shot_count):
+                    stale_shot_count = None
+                    shot_count = new_shot_count
+                if shot_count <= release_shot:
+                    time.sleep(self.sweep_stream_poll_interval)
+            self._insert_sweep_chunk(param, chunk)
+
+    def _fetch_batch_shot_count(self) -> int:
+        """Returns the current value of the shot counter of the batch"""
+        shot_counter = getattr(
+            self.driver.qm_job.result_handles, f"{self.name}_shots")
+        shot_count = shot_counter.fetch_all()
+        if shot_count is None:
+            return 0
+        return int(shot_count[0])
+
+    def _insert_sweep_chunk(self, param: SequenceParameter, chunk: list) -> None:
+        """Inserts one chunk of setpoints into the stream of the parameter"""
+        self.driver.qm_job.insert_input_stream(
+            name = param.sequence_path,
+            data = chunk
+        )
+
+    def push_live_parameters(self) -> None:
+        """
+        Pushes the current values of all live parameters to the running job.
+        Has to be called once before each batch is resumed, which is done by
+        the measurement loop.
+        """
+        for qua_type, params in self._get_live_parameters_by_type().items():
+            values = []
+            for param in params:
+                if qua_type == bool:
+                    values.append(bool(param.get()))
+                elif qua_type == int:
+                    values.append(int(param.get()*param.scale))
+                else:
+                    values.append(float(param.get()*param.scale))
+            logging.debug(
+                "Pushing live %s parameters %s", qua_type.__name__, values)
+            self.driver.qm_job.insert_input_stream(
+                name = f"{self.short_name}_{qua_type.__name__}_live_stream",
+                data = values
+            )
+
     def add_available_gettables(self, gettables: list) -> None:
         """
         Adds given gettables to the list of all gettables
@@ -434,14 +763,118 @@ class Measurement(SequenceBase):
     def _configure_gettables(self) -> None:
         """
         Configures all gettables to be measured. Sets batch_size, can_resume,
-        setpoints and vals
+        setpoints, vals and the index maps to unfold snaked sweeps. Axes that
+        are reduced on the server are removed from setpoints and shape.
         """
         for i, gettable in enumerate(self.gettables):
             gettable.batch_size = self.sweep_size
             gettable.can_resume = True if i==(len(self.gettables)-1) else False
-            gettable.setpoints = self._setpoints_for_gettables
-            gettable.vals = Arrays(
-                shape = tuple(sweep.length for sweep in self.sweeps))
+            bin_edges = self._get_gettable_bin_edges(gettable)
+            if bin_edges is not None:
+                self._configure_histogram_gettable(gettable, bin_edges)
+                continue
+            gettable.bin_centers = None
+            gettable.bit_packed = self._get_gettable_bit_packing(gettable)
+            reduced_axis = self._get_gettable_reduced_axis(gettable)
+            setpoints = self._setpoints_for_gettables
+            sizes = tuple(sweep.length for sweep in self.sweeps)
+            if reduced_axis is not None:
+                reduced_sweep = self.sweeps[reduced_axis]
+                setpoints = tuple(
+                    param for param in setpoints
+                    if param not in reduced_sweep.parameters)
+                sizes = sizes[:reduced_axis] + sizes[reduced_axis + 1:]
+            gettable.reduced_axis = reduced_axis
+            gettable.index_maps = self._get_snake_index_maps(reduced_axis)
+            gettable.setpoints = setpoints
+            gettable.vals = Arrays(shape = sizes)
+
+    def _get_gettable_bin_edges(self, gettable) -> np.ndarray | None:
+        """Returns the histogram bin edges for the observable of the gettable"""
+        observable = getattr(gettable, 'observable', None)
+        if observable is None:
+            return None
+        return observable.bin_edges
+
+    def _get_gettable_bit_packing(self, gettable) -> bool:
+        """Whether the observable of the gettable packs its bool results"""
+        observable = getattr(gettable, 'observable', None)
+        return observable is not None and observable.packs_bits
+
+    def _configure_histogram_gettable(
+            self, gettable, bin_edges: np.ndarray) -> None:
+        """
+        Configures a gettable returning histogram counts. The bin centers are
+        its only setpoints
+
+        Args:
+            gettable (GettableParameter): Gettable to configure
+            bin_edges (np.ndarray): Edges of the histogram bins
+        """
+        bin_centers = (bin_edges[:-1] + bin_edges[1:])/2
+        gettable.bin_centers = bin_centers
+        gettable.bit_packed = False
+        gettable.reduced_axis = None
+        gettable.index_maps = None
+        gettable.setpoints = (qc.Parameter(
+            name = f"{gettable.name}_bins",
+            label = "Bin center",
+            unit = gettable.unit,
+            get_cmd = lambda: bin_centers,
+            vals = Arrays(shape = bin_centers.shape)
+        ),)
+        gettable.vals = Arrays(shape = bin_centers.shape)
+
+    def _get_gettable_reduced_axis(self, gettable) -> int | None:
+        """Returns the axis reduced for the observable of the gettable"""
+        observable = getattr(gettable, 'observable', None)
+        if observable is None or observable.reduction is None:
+            return None
+        return self.get_reduced_axis(
+            observable.reduction_axis, tuple(self.sweeps))
+
+    @staticmethod
+    def _is_snaked(sweep) -> bool:
+        """Whether the given sweep is snaked on the OPX"""
+        return bool(sweep.snake_scan) and not sweep.inputs_are_streamed \
+            and sweep.can_be_parameterized
+
+    def _get_snake_index_maps(
+            self, reduced_axis: int | None = None) -> tuple | None:
+        """
+        Computes the index maps unfolding the flat OPX buffer of snaked or
+        shuffled sweeps into the shape of the sweeps. The index maps are
+        computed once and are shared between all gettables. Only parameterized
+        sweeps are snaked on the OPX. A snaked outermost sweep changes
+        direction each batch, hence one map is returned for even and one for
+        odd batches.
+
+        Args:
+            reduced_axis (int, optional): Axis that is reduced on the server
+                and therefore not part of the fetched results
+
+        Returns:
+            tuple | None: Index maps for even and odd batches. None if no sweep
+                is snaked or shuffled
+        """
+        sizes = tuple(sweep.length for sweep in self.sweeps)
+        snaked = tuple(self._is_snaked(sweep) for sweep in self.sweeps)
+        permutations = tuple(sweep.permutation for sweep in self.sweeps)
+        if reduced_axis is not None:
+            sizes = sizes[:reduced_axis] + sizes[reduced_axis + 1:]
+            snaked = snaked[:reduced_axis] + snaked[reduced_axis + 1:]
+            permutations = permutations[:reduced_axis] \
+                + permutations[reduced_axis + 1:]
+        if not any(snaked) and all(p is None for p in permutations):
+            return None
+        even_map = utils.get_snake_index_map(
+            sizes, snaked, permutations = permutations)
+        if not snaked[0]:
+            return even_map, even_map
+        odd_map = utils.get_snake_index_map(
+            sizes, snaked, reverse_outermost = True,
+            permutations = permutations)
+        return even_map, odd_map
 
     def _check_given_gettables(self, gettables: list) -> None:
         """
@@ -497,6 +930,51 @@ class Measurement(SequenceBase):
             setattr(self, f"_qua_{type.__name__}_input_stream", input_stream)
             self._input_stream_type_shapes[type.__name__] = length
 
+    def _get_live_parameters_by_type(self) -> dict:
+        """Returns the live parameters grouped by their QUA type"""
+        live_params = {}
+        for qua_type in [bool, int, qua.fixed]:
+            params = [p for p in self.live_parameters if p.var_type == qua_type]
+            if params:
+                live_params[qua_type] = params
+        return live_params
+
+    def _qua_declare_live_streams(self) -> None:
+        """
+        Declares QUA variables for all live parameters and one input stream
+        per QUA type to feed them
+
+        Raises:
+            ValueError: If live parameters are used in continuous mode or are
+                swept or input streamed
+        """
+        if not self.live_parameters:
+            return
+        if self.continuous_mode:
+            raise ValueError(
+                "Live parameters require the OPX to pause between batches")
+        ### Sweeps might have been set after the parameters were made live
+        for param in self.live_parameters:
+            self._check_live_parameter_is_free(param)
+        for qua_type, params in self._get_live_parameters_by_type().items():
+            for param in params:
+                param.qua_var = qua.declare(param.var_type)
+                param.qua_sweeped = True
+            input_stream = qua.declare_input_stream(
+                qua_type,
+                name = f"{self.short_name}_{qua_type.__name__}_live_stream",
+                size = len(params)
+            )
+            setattr(self, f"_qua_{qua_type.__name__}_live_stream", input_stream)
+
+    def _qua_advance_live_streams(self) -> None:
+        """Assigns the values pushed for this batch to the live parameters"""
+        for qua_type, params in self._get_live_parameters_by_type().items():
+            input_stream = getattr(self, f"_qua_{qua_type.__name__}_live_stream")
+            qua.advance_input_stream(input_stream)
+            for i, param in enumerate(params):
+                qua.assign(param.qua_var, input_stream[i])
+
     def get_sequence_path(self):
         """Returns its name since Measurement is the top level"""
         return self.name
@@ -510,6 +988,53 @@ class Measurement(SequenceBase):
                 )
         self._input_stream_parameters.append(parameter)
 
+    def add_live_parameter(self, parameter) -> None:
+        """
+        Adds given parameter to the live parameters. The parameter is declared
+        as QUA variable and its value is pushed to the job before each batch
+
+        Args:
+            parameter (SequenceParameter): Scalar parameter to be added
+
+        Raises:
+            TypeError: If parameter is not of type SequenceParameter
+            ValueError: If the parameter is already live, swept, input
+                streamed or not a scalar
+        """
+        if not isinstance(parameter, SequenceParameter):
+            raise TypeError(
+                "Parameter must be of type SequenceParameter, "
+                f"is: {type(parameter)}"
+                )
+        if parameter in self._live_parameters:
+            raise ValueError(f"Parameter {parameter.name} is already live")
+        self._check_live_parameter_is_free(parameter)
+        if parameter.var_type not in (bool, int, qua.fixed):
+            raise ValueError(
+                f"Parameter {parameter.name} has invalid type "
+                f"{parameter.var_type}"
+                )
+        if np.ndim(parameter.get()) != 0:
+            raise ValueError(
+                f"Only scalar parameters can be live, {parameter.name} is not")
+        self._live_parameters.append(parameter)
+
+    def _check_live_parameter_is_free(self, parameter) -> None:
+        """
+        Checks that the QUA variable of a live parameter is not assigned by a
+        sweep or an input stream, which would overwrite the pushed values
+
+        Raises:
+            ValueError: If the parameter is swept or input streamed
+        """
+        if any(parameter in sweep.parameters for sweep in self.sweeps):
+            raise ValueError(
+                f"Parameter {parameter.name} is swept and can not be live")
+        if parameter in self.input_stream_parameters:
+            raise ValueError(
+                f"Parameter {parameter.name} is input streamed and can not be "
+                "live")
+
     def advance_input_streams(self, new_value_dict: dict) -> None:
         """
         Advances all input streams by one step with the new given values
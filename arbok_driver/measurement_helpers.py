@@ -1,5 +1,5 @@
 """ Helper tools for running and measuring OPX sequences"""
-import copy
+import sys
 import time
 import logging
 
@@ -8,15 +8,22 @@ from rich.progress import Progress
 from qcodes.dataset import Measurement
 from qcodes.dataset.measurements import Runner
 
+from .batch_pipeline import BatchPipeline
+from .parameter_setter import ParameterSetter
+
 def create_measurement_loop(
     sequence,
     measurement: Measurement,
     sweep_list: list[dict],
     register_all: bool = False,
+    pipelined: bool = False,
+    max_pending_batches: int = 2,
+    concurrent_set: bool = False,
+    settle_time: float = 0.,
     ):
     """
     Decorator to create a measurement loop for a given measurement. Registers
-    all measurement parameters and creates the measurement loops recuresively.
+    all measurement parameters and iterates over the grid of external setpoints.
     The OPX measurement can be regarded as the innermost loops of the
     measurement. However the OPX returns all results it measures in the loops in
     the qua measurement in one batch. Therefore in QCoDeS logic a get() on the
@@ -38,11 +45,28 @@ def create_measurement_loop(
         register_all (bool, optional): Whether all concurrently swept parameters
             are registered in the measurement. Breaks live plotting.
             Defaults to False
+        pipelined (bool, optional): Whether the OPX is resumed as soon as the
+            raw results of a batch are fetched. Reshaping and saving then runs
+            on a writer thread while the next batch is measured. Queue depth
+            and write latency are shown in the progress bars. Background
+            writing and its reporting are only used in pipelined mode,
+            otherwise each batch is saved in the measurement thread before
+            the next one is started. Defaults to False
+        max_pending_batches (int, optional): Maximum number of fetched batches
+            waiting to be saved in pipelined mode. Defaults to 2
+        concurrent_set (bool, optional): Whether parameters on different
+            instruments are set concurrently. Defaults to False
+        settle_time (float, optional): Time in s to wait after setting external
+            parameters before the OPX is resumed. Defaults to 0
 
     Returns:
         qcodes.Dataset: Dataset of the measurement
+
+    Raises:
+        ValueError: If external parameters are swept in continuous mode
     """
     logging.debug("Creating measurement loop")
+    _check_continuous_sweep_list(sequence, sweep_list)
     sweep_lengths = [len(next(iter(dic.values()))) for dic in sweep_list]
     nr_sweep_list_points = np.prod(sweep_lengths)
     def decorator(func):
@@ -66,10 +90,11 @@ def create_measurement_loop(
                 measurement.register_parameter(
                     gettable, setpoints = gettable_setpoints)
 
-            ### The measurement is run with the recursive measurement loop over
-            ### the qcodes (non-opx) parameters
-            with measurement.run() as datasaver:
-                ### Measurement loops are generated recursively
+            ### The measurement is run with a single loop over the setpoint
+            ### grid of the qcodes (non-opx) parameters. Pipelined batches are
+            ### added from a worker thread which can not use the sqlite
+            ### connection of this thread, hence qcodes writes in background
+            with measurement.run(write_in_background = pipelined) as datasaver:
                 with Progress() as progress_tracker:
                     progress_bars = {}
 
@@ -79,16 +104,48 @@ def create_measurement_loop(
                     progress_bars['batch_progress'] = progress_tracker.add_task(
                         description = "[cyan]Batch progress...",
                         total = sequence.sweep_size)
-                    _create_recursive_measurement_loop(
-                        sequence = sequence,
-                        datasaver = datasaver,
-                        sweeps_list_temp = sweep_list,
-                        res_args_dict= result_args_dict,
-                        inner_function=func,
-                        progress_bars = progress_bars,
-                        progress_tracker = progress_tracker,
-                        **kwargs
+                    pipeline = None
+                    if pipelined:
+                        ### Fetched batches stay valid until the worker has
+                        ### processed them: queued ones, the one being
+                        ### processed and the one being fetched
+                        for gettable in sequence.gettables:
+                            gettable.nr_batch_buffers = max_pending_batches + 2
+                        progress_bars['writer'] = progress_tracker.add_task(
+                            description = "[magenta]Writer...", total = None)
+                        pipeline = BatchPipeline(
+                            datasaver = datasaver,
+                            max_pending_batches = max_pending_batches,
+                            on_batch_done = lambda: _update_writer_progress(
+                                pipeline, progress_bars, progress_tracker)
                         )
+                    parameter_setter = ParameterSetter(
+                        concurrent = concurrent_set, settle_time = settle_time)
+                    try:
+                        _run_measurement_loop(
+                            sequence = sequence,
+                            datasaver = datasaver,
+                            sweep_list = sweep_list,
+                            res_args_dict= result_args_dict,
+                            inner_function=func,
+                            progress_bars = progress_bars,
+                            progress_tracker = progress_tracker,
+                            pipeline = pipeline,
+                            parameter_setter = parameter_setter,
+                            **kwargs
+                            )
+                    finally:
+                        parameter_setter.close()
+                        ### Pending batches are saved even if interrupted
+                        if pipeline is not None:
+                            pipeline.close(
+                                raise_errors = sys.exc_info()[0] is None)
+                            logging.info(
+                                "Writer saved %s batches, max queue depth %s, "
+                                "mean write latency %s s",
+                                pipeline.nr_processed_batches,
+                                pipeline.max_queue_depth,
+                                pipeline.mean_write_latency)
                     print("Measurement finished!")
                 dataset = datasaver.dataset
             return dataset
@@ -100,6 +157,10 @@ def run_arbok_measurement(
     measurement: Measurement,
     sweep_list: list[dict],
     register_all: bool = False,
+    pipelined: bool = False,
+    max_pending_batches: int = 2,
+    concurrent_set: bool = False,
+    settle_time: float = 0.,
     ):
     """
     Function calling the decorator `create_measurement_loop` without a function
@@ -108,7 +169,11 @@ def run_arbok_measurement(
         sequence = sequence,
         measurement = measurement,
         sweep_list = sweep_list,
-        register_all = register_all
+        register_all = register_all,
+        pipelined = pipelined,
+        max_pending_batches = max_pending_batches,
+        concurrent_set = concurrent_set,
+        settle_time = settle_time
         )
 
     @filled_decorator
@@ -117,6 +182,43 @@ def run_arbok_measurement(
     dataset = dummy_function()
     return dataset
 
+def _update_writer_progress(
+        pipeline: BatchPipeline,
+        progress_bars: dict,
+        progress_tracker: Progress
+        ) -> None:
+    """Updates the progress bars after the pipeline saved a batch"""
+    progress_tracker.update(progress_bars['total_progress'], advance = 1)
+    progress_tracker.update(
+        progress_bars['writer'],
+        description = (
+            "[magenta]Writer queue "
+            f"{pipeline.nr_pending_batches}/{pipeline.max_pending_batches}\n"
+            f"Write latency {1e3*pipeline.last_write_latency:.1f} ms"
+        )
+    )
+
+def _check_continuous_sweep_list(sequence, sweep_list: list[dict]) -> None:
+    """
+    In continuous mode the OPX never pauses and measures the next batches
+    while the external parameters of the current one are set. Batches would
+    be saved with the wrong external setpoints, hence only the iteration
+    counter of the driver can be swept outside the OPX
+
+    Raises:
+        ValueError: If external parameters are swept in continuous mode
+    """
+    if not sequence.continuous_mode:
+        return
+    iteration = getattr(sequence.driver, 'iteration', None)
+    for sweep_dict in sweep_list:
+        for param in sweep_dict:
+            if param is not iteration:
+                raise ValueError(
+                    "Continuous mode does not pause the OPX between batches. "
+                    f"External parameter {param.name} can't be swept, use "
+                    "OPX sweeps or iterations only")
+
 def _get_result_arguments(
         sweep_list: list[dict],
         register_all: bool = False) -> dict:
@@ -148,80 +250,136 @@ def _get_result_arguments(
                     "Not adding settable %s on axis %s", param.name, i)
     return result_args_dict
 
-def _create_recursive_measurement_loop(
+def _get_setpoint_grid(sweep_list: list[dict]) -> tuple[int, dict]:
+    """
+    Precomputes the full grid of external setpoints. The first sweep axis is
+    the outermost one. Parameters on the same axis are swept concurrently.
+
+    Args:
+        sweep_list (list[dict]): List of dictionairies with params as keys and
+            setpoints as values. Each list entry creates one sweep axis
+
+    Returns:
+        int: Number of points in the setpoint grid
+        dict: Parameters as keys and flat arrays with their value at each
+            point of the grid as values
+    """
+    sweep_lengths = [len(next(iter(dic.values()))) for dic in sweep_list]
+    nr_points = int(np.prod(sweep_lengths))
+    grid_indices = np.indices(sweep_lengths).reshape(
+        len(sweep_lengths), nr_points)
+    setpoint_grid = {}
+    for axis, sweep_dict in enumerate(sweep_list):
+        for param, values in sweep_dict.items():
+            setpoint_grid[param] = np.asarray(values)[grid_indices[axis]]
+    return nr_points, setpoint_grid
+
+def _run_measurement_loop(
         sequence,
         datasaver: Runner,
-        sweeps_list_temp: list,
+        sweep_list: list,
         res_args_dict: dict,
         progress_bars: list,
         progress_tracker: any,
         *args: any,
         inner_function = None,
+        pipeline: BatchPipeline = None,
+        parameter_setter: ParameterSetter = None,
         **kwargs: any
         ):
     """
-    Recursive generation of parameter sweeps for all axis given in dict
-    ext_settables
+    Iterates over the precomputed grid of external setpoints in a single loop
+    and measures one batch on each point. Parameters are only set if their
+    value changed since the last point.
 
     Args:
-        sweeps_list_temp (list): List of dictionairies of given sweeps
-        result_args_temp (list): List of tuples of params their values
+        sweep_list (list): List of dictionairies of given sweeps
+        res_args_dict (dict): Registered parameters (keys) of the sweeps
+        pipeline (BatchPipeline, optional): Pipeline saving the batches on a
+            worker thread. If None, batches are saved before the next point
+        parameter_setter (ParameterSetter, optional): Setter for the changed
+            parameters of each point. Defaults to setting them sequentially
     """
-    if not sweeps_list_temp:
-        ### This is the end of the recursion.
+    if parameter_setter is None:
+        parameter_setter = ParameterSetter(concurrent = False)
+    nr_points, setpoint_grid = _get_setpoint_grid(sweep_list)
+    registered_setpoints = [
+        (param, setpoint_grid[param]) for param in res_args_dict]
+    for param in setpoint_grid:
+        if param not in res_args_dict:
+            logging.debug( "Param %s on %s not registered",
+                param.instrument, param.name)
+    last_values = {}
+    for point in range(nr_points):
+        ### Only parameters whose value changed are set
+        changed_values = {}
+        for param, values in setpoint_grid.items():
+            value = values[point]
+            if param in last_values and last_values[param] == value:
+                continue
+            changed_values[param] = value
+        parameter_setter.set(changed_values)
+        last_values.update(changed_values)
+
         ### If an inner_function is given it is executed HERE
         if inner_function is not None:
             logging.debug("calling inner function")
             inner_function(*args, **kwargs)
-
-        ### Program is resumed and all gettables are fetched when ready
-        sequence.driver.qm_job.resume()
-        logging.debug("Job resumed, Fetching gettables")
-        result_args_temp = []
-        for gettable in sequence.gettables:
-            result_args_temp.append(
-                (
-                    gettable,
-                    gettable.get_raw(
-                        progress_bar = (
-                            progress_bars['batch_progress'], progress_tracker,
-                        )
-                    )
-                )
+        _measure_batch(
+            sequence = sequence,
+            datasaver = datasaver,
+            setpoint_args = [
+                (param, values[point]) for param, values in registered_setpoints
+            ],
+            progress_bars = progress_bars,
+            progress_tracker = progress_tracker,
+            pipeline = pipeline
             )
 
-        ### Retreived results are added to the datasaver
-        result_args_temp += list(res_args_dict.values())
-        datasaver.add_result(*result_args_temp)
-        progress_tracker.update(progress_bars['total_progress'], advance=1)
-        progress_tracker.refresh()
+def _measure_batch(
+        sequence,
+        datasaver: Runner,
+        setpoint_args: list,
+        progress_bars: list,
+        progress_tracker: any,
+        pipeline: BatchPipeline = None
+        ):
+    """
+    Resumes the program, fetches all gettables of the batch and saves them
+    together with the given external setpoints
+
+    Args:
+        setpoint_args (list): Tuples of registered params and their values
+        pipeline (BatchPipeline, optional): Pipeline saving the batches on a
+            worker thread. If None, the batch is saved before returning
+    """
+    ### Program is resumed and all gettables are fetched in one pass
+    ### In continuous mode the program never pauses and batches are
+    ### consumed by index as they arrive
+    ### Chunks of streamed sweeps are inserted while the batch is measured
+    stream_feeder = None
+    if sequence.streamed_sweeps:
+        stream_feeder = sequence.feed_sweep_streams()
+    if not sequence.continuous_mode:
+        ### Live parameters are consumed by the OPX right after resuming
+        if sequence.live_parameters:
+            sequence.push_live_parameters()
+        sequence.driver.qm_job.resume()
+    logging.debug("Job resumed, Fetching gettables")
+    progress_bar = (progress_bars['batch_progress'], progress_tracker)
+    if pipeline is not None:
+        ### Only the raw buffers are fetched here and saved on the worker
+        raw_results = sequence.batch_collector.collect_raw(
+            progress_bar = progress_bar)
+        if stream_feeder is not None:
+            stream_feeder.result()
+        pipeline.put(raw_results, setpoint_args)
         return
+    batch_results = sequence.batch_collector.collect(progress_bar = progress_bar)
+    if stream_feeder is not None:
+        stream_feeder.result()
 
-    ### The first axis will be popped from the list and iterated over
-    sweeps_list_temp = copy.copy(sweeps_list_temp)
-    sweep_dict = sweeps_list_temp.pop(0)
-    for idx in range(len(list(sweep_dict.values())[0])):
-        ### The parameter values are set for the current iteration
-        for param, values in sweep_dict.items():
-            value = values[idx]
-            logging.debug('Setting %s to %s', param.instrument.name, value)
-            param.set(value)
-
-            ### The parameter is added to the result arguments dict if its
-            ### dict entry is registered
-            if param in res_args_dict:
-                res_args_dict[param] = (param, value)
-            else:
-                logging.debug( "Param %s on %s not registered",
-                    param.instrument, param.name)
-        _create_recursive_measurement_loop(
-                *args,
-                sequence = sequence,
-                datasaver = datasaver,
-                sweeps_list_temp = sweeps_list_temp,
-                res_args_dict = res_args_dict,
-                inner_function = inner_function,
-                progress_bars = progress_bars,
-                progress_tracker = progress_tracker,
-                **kwargs
-                )
+    ### Retreived results are added to the datasaver
+    datasaver.add_result(*batch_results.items(), *setpoint_args)
+    progress_tracker.update(progress_bars['total_progress'], advance=1)
+    progress_tracker.refresh()
@@ -1,7 +1,12 @@
 """Module containing Observable class"""
 import logging
+import numpy as np
 from qm import qua
 
+from .sequence_parameter import SequenceParameter
+
+REDUCTIONS = ('mean', 'sum', 'var')
+
 class ObservableBase:
     """
     Base class for observables for both I and Q readouts and AbstractReadouts
@@ -28,6 +33,101 @@ class ObservableBase:
 
         self.qm_elements = None
 
+        self.reduction = None
+        self.reduction_axis = None
+        self.histogram_edges = None
+        self.pack_bits = False
+        self.qua_packed_var = None
+        self.qua_pack_counter = None
+
+    @property
+    def packs_bits(self) -> bool:
+        """
+        Whether the boolean results of this observable are packed into 32-bit
+        integers on the FPGA before being saved. Packing is opt-in by setting
+        `pack_bits` and only applies to unreduced bool observables
+        """
+        return self.pack_bits and getattr(self, 'qua_type', None) == bool \
+            and self.reduction is None and self.histogram_edges is None
+
+    def set_reduction(self, reduction: str | None, axis = None) -> None:
+        """
+        Sets a reduction that is applied to the results of the observable on
+        the QM server via stream processing. Only the reduced results of each
+        batch are transferred and the swept axis is removed from the shape
+        and setpoints of the associated gettable. Only axes swept within the
+        QUA program can be reduced. External sweeps like the `iteration` of
+        the driver span several batches and are not available on the server.
+
+        Args:
+            reduction (str | None): One of `REDUCTIONS`. None disables the
+                reduction
+            axis (SequenceParameter): Parameter swept along the axis to reduce
+
+        Raises:
+            ValueError: If the reduction is not valid or no axis is given
+            TypeError: If the axis is not a `SequenceParameter`
+        """
+        if reduction is None:
+            self.reduction = None
+            self.reduction_axis = None
+            return
+        if reduction not in REDUCTIONS:
+            raise ValueError(
+                f"Reduction {reduction} not valid. Must be in {REDUCTIONS}")
+        if axis is None:
+            raise ValueError(f"Reduction {reduction} requires an axis")
+        if not isinstance(axis, SequenceParameter):
+            raise TypeError(
+                f"Reduction axis {axis} must be a SequenceParameter swept on "
+                "the OPX. External sweeps can not be reduced on the server")
+        self.histogram_edges = None
+        self.reduction = reduction
+        self.reduction_axis = axis
+
+    def set_histogram(self, bin_edges) -> None:
+        """
+        Bins all shots of a batch into a histogram on the QM server via stream
+        processing. Only the counts per bin are transferred and the associated
+        gettable returns one count per bin with the bin centers as setpoints.
+        The edges are read when the QUA program is generated.
+
+        Args:
+            bin_edges (SequenceParameter | list | None): Either a parameter
+                holding an array of bin edges or a list of parameters (or
+                numbers) for the individual edges. None disables histogramming
+        """
+        self.histogram_edges = bin_edges
+        if bin_edges is not None:
+            self.reduction = None
+            self.reduction_axis = None
+            _ = self.bin_edges
+
+    @property
+    def bin_edges(self) -> np.ndarray | None:
+        """
+        Current values of the histogram bin edges
+
+        Raises:
+            ValueError: If less than two edges are given or they are not
+                strictly increasing
+        """
+        if self.histogram_edges is None:
+            return None
+        edges = self.histogram_edges
+        if callable(edges):
+            edges = edges()
+        edges = np.array(
+            [edge() if callable(edge) else edge for edge in edges],
+            dtype = float
+            )
+        if edges.ndim != 1 or edges.size < 2:
+            raise ValueError(
+                f"At least two bin edges are required, got {edges}")
+        if np.any(np.diff(edges) <= 0):
+            raise ValueError(f"Bin edges must be increasing, got {edges}")
+        return edges
+
     def __call__(self):
         """
         Overwrites the default calling behaviour and returns the associated
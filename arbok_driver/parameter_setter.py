@@ -0,0 +1,114 @@
+""" Module containing ParameterSetter class """
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+class ParameterSetter:
+    """
+    Sets external (non-OPX) parameters of a sweep point. Parameters on
+    different instruments are set concurrently on a thread pool, while
+    parameters on the same instrument are set one after another while holding
+    a lock of that instrument. `set` returns once all parameters are set and
+    the optional settle time has passed.
+
+    Attributes:
+        concurrent (bool): Whether different instruments are set concurrently
+        max_workers (int): Maximum number of instruments set concurrently
+        settle_time (float): Time in s to wait after setting parameters
+    """
+    def __init__(
+            self,
+            concurrent: bool = True,
+            max_workers: int | None = None,
+            settle_time: float = 0.
+            ):
+        """
+        Constructor method of ParameterSetter
+
+        Args:
+            concurrent (bool, optional): Whether parameters on different
+                instruments are set concurrently. Defaults to True
+            max_workers (int, optional): Maximum number of threads. Defaults to
+                the thread pool default
+            settle_time (float, optional): Time in s to wait after parameters
+                have been set. Defaults to 0
+        """
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.settle_time = settle_time
+        self._instrument_locks = {}
+        self._locks_lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+
+    def set(self, values: dict) -> None:
+        """
+        Sets the given parameters and waits until all of them are set. Errors
+        of individual setters are raised after all setters have finished.
+
+        Args:
+            values (dict): Parameters as keys and their new values as values
+        """
+        if not values:
+            return
+        instrument_groups = {}
+        for param, value in values.items():
+            key = self._get_instrument(param)
+            instrument_groups.setdefault(key, []).append((param, value))
+        if not self.concurrent or len(instrument_groups) == 1:
+            for key, group in instrument_groups.items():
+                self._set_group(key, group)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers = self.max_workers,
+                    thread_name_prefix = "arbok_parameter_setter"
+                )
+            futures = [
+                self._executor.submit(self._set_group, key, group)
+                for key, group in instrument_groups.items()
+            ]
+            errors = [f.exception() for f in futures if f.exception()]
+            if errors:
+                raise errors[0]
+        if self.settle_time > 0:
+            time.sleep(self.settle_time)
+
+    def _set_group(self, instrument, group: list) -> None:
+        """Sets the parameters of one instrument holding its lock"""
+        with self._get_lock(instrument):
+            for param, value in group:
+                logging.debug('Setting %s to %s', param.name, value)
+                param.set(value)
+
+    def _get_lock(self, instrument) -> threading.Lock:
+        """Returns the lock of the given instrument"""
+        with self._locks_lock:
+            if instrument not in self._instrument_locks:
+                self._instrument_locks[instrument] = threading.Lock()
+            return self._instrument_locks[instrument]
+
+    @staticmethod
+    def _get_instrument(param):
+        """
+        Returns the root instrument of the parameter. Parameters without an
+        instrument are treated as an instrument of their own
+        """
+        instrument = getattr(param, 'root_instrument', None)
+        if instrument is None:
+            instrument = getattr(param, 'instrument', None)
+        if instrument is None:
+            return param
+        return instrument
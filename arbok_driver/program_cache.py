@@ -0,0 +1,77 @@
+""" Module containing ProgramCache class """
+from collections import OrderedDict
+import logging
+
+class ProgramCache:
+    """
+    Least recently used cache for generated QUA programs. Programs are stored
+    under the structural hash of the sequence that generated them, hence a
+    program is only regenerated if anything that enters its QUA code changed.
+
+    Attributes:
+        maxsize (int): Maximum number of cached programs. Zero disables caching
+        hits (int): Number of successful lookups
+        misses (int): Number of failed lookups
+    """
+    def __init__(self, maxsize: int = 8):
+        """
+        Constructor method of ProgramCache
+
+        Args:
+            maxsize (int, optional): Maximum number of cached programs.
+                Defaults to 8
+        """
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be positive, is {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str):
+        """
+        Returns the entry stored under the given key and marks it as the most
+        recently used one
+
+        Args:
+            key (str): Structural hash of the program
+
+        Returns:
+            any: The cached entry or None if the key is unknown
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        logging.debug("Program cache hit for %s", key)
+        return self._entries[key]
+
+    def put(self, key: str, entry) -> None:
+        """
+        Stores the given entry and evicts the least recently used entries if
+        the cache is full
+
+        Args:
+            key (str): Structural hash of the program
+            entry (any): Entry to be cached
+        """
+        if self.maxsize == 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            evicted_key, _ = self._entries.popitem(last = False)
+            logging.debug("Evicted program %s from cache", evicted_key)
+
+    def clear(self) -> None:
+        """Removes all entries and resets the statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
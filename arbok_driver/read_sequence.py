@@ -175,6 +175,7 @@ class ReadSequence(SubSequence):
             name = observable.full_name,
             register_name = observable.full_name,
             sequence = self,
+            observable = observable,
             vals = Arrays(shape = (1,))
         )
         new_gettable = getattr(self, observable.full_name)
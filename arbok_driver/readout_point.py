@@ -112,11 +112,14 @@ class ReadoutPoint(ABC):
 
     def qua_save_streams(self):
         """Saves streams and buffers of streams"""
-        sweep_size = self.signal.sequence.measurement.sweep_size
+        measurement = self.signal.sequence.measurement
         if not self.save_values:
             logging.debug("Values of point %s will not be streamed.", self.name)
             return
         for obs_name, observable in self.observables.items():
             logging.debug("Saving stream %s", obs_name)
-            buffer = observable.qua_stream.buffer(sweep_size)
-            buffer.save(f"{observable.full_name}_buffer")
+            measurement.qua_save_batch_stream(
+                observable.qua_stream, f"{observable.full_name}_buffer",
+                reduction = observable.reduction,
+                reduction_axis = observable.reduction_axis,
+                bin_edges = observable.bin_edges)
@@ -1,15 +1,18 @@
 """ Module containing BaseSequence class """
 
-import copy
 from os import pathsep
 from typing import Optional
 import logging
 
+import numpy as np
+
 from qcodes.instrument import InstrumentModule
 
-from qm import SimulationConfig, generate_qua_script, qua, QuantumMachinesManager
+from qm import SimulationConfig, qua, QuantumMachinesManager
 from qm.simulate.credentials import create_credentials
 
+from .host_state import HostState
+from .program_cache import ProgramCache
 from .sample import Sample
 from .sequence_parameter import SequenceParameter
 from . import utils
@@ -48,7 +51,10 @@ class SequenceBase(InstrumentModule):
 
         self._sub_sequences = []
         self._gettables = []
-        self._qua_program_as_str = None
+        self._qua_program = None
+        self._qua_generation_plans = {}
+        self._parameter_index = {}
+        self.program_cache = ProgramCache()
         self.add_qc_params_from_config(self.sequence_config)
 
     def qua_declare(self):
@@ -93,6 +99,46 @@ class SequenceBase(InstrumentModule):
     def add_subsequence(self, new_sequence) -> None:
         """Adds a subsequence to self"""
         self._sub_sequences.append(new_sequence)
+        self._invalidate_qua_generation_plans()
+
+    def add_submodule(self, name: str, submodule) -> None:
+        """Adds a submodule to self and invalidates the generation plans"""
+        super().add_submodule(name, submodule)
+        self._invalidate_qua_generation_plans()
+
+    def add_parameter(self, name: str, *args, **kwargs):
+        """
+        Adds a parameter to self and indexes SequenceParameters under their
+        config name and element for `find_parameter`
+        """
+        super().add_parameter(name, *args, **kwargs)
+        param = self.parameters[name]
+        if isinstance(param, SequenceParameter) and param.element is not None:
+            self._parameter_index[(param.config_name, param.element)] = param
+        return param
+
+    def _parameter_lookup_chain(self) -> tuple:
+        """Sequences searched for parameters in order of precedence"""
+        return (self,)
+
+    def _lookup_parameter(self, key: str, element: str):
+        """
+        Returns the parameter with the given config name and element from the
+        parameter index or by its name `{key}_{element}` or None if not found.
+        Follows the same precedence as `getattr(self, f"{key}_{element}")`
+
+        Args:
+            key (str): Config name of the parameter
+            element (str): Element of the parameter
+        """
+        name = f"{key}_{element}"
+        for sequence in self._parameter_lookup_chain():
+            if name in sequence.parameters:
+                return sequence.parameters[name]
+            param = sequence._parameter_index.get((key, element))
+            if param is not None:
+                return param
+        return None
 
     def add_qc_params_from_config(self, config):
         """ 
@@ -120,10 +166,13 @@ class SequenceBase(InstrumentModule):
             self._add_param(param_name, param_name, param_dict)
 
     def get_qua_program_as_str(self) -> str:
-        """Returns the qua program as str. Will be compiled if it wasnt yet"""
-        if self._qua_program_as_str is None:
+        """
+        Returns the qua program as str. Will be compiled if it wasnt yet. The
+        script is generated on demand and memoized per program
+        """
+        if self._qua_program is None:
             self.get_qua_program()
-        return self._qua_program_as_str
+        return utils.get_qua_script(self._qua_program)
 
     def get_qua_program(self, simulate = False):
         """
@@ -133,16 +182,122 @@ class SequenceBase(InstrumentModule):
         scans have reached the lowest level of sequences (e.g sequences have no
         sub-sequences anymore)
 
+        Programs are cached under the structural hash of the sequence. If
+        nothing that enters the QUA code changed, the cached program is
+        returned without regenerating it. The QUA variables and streams that
+        were stored on host objects during its generation are restored (see
+        `HostState`). The QUA script is not generated here (see
+        `get_qua_program_as_str`).
+
         Args:
             simulate (bool): Flag whether program is simulated
         Returns:
             program: Program compiled into QUA language
         """
+        program_hash = self.get_structural_hash(simulate)
+        cached_entry = self.program_cache.get(program_hash)
+        if cached_entry is not None:
+            cached_program, host_state = cached_entry
+            if host_state.restore(self.measurement):
+                self._qua_program = cached_program
+                return cached_program
         with qua.program() as prog:
             self.get_qua_code(simulate)
-        self._qua_program_as_str = generate_qua_script(prog)
+        host_state = HostState(self.measurement)
+        self._qua_program = prog
+        ### Sequences may assign QUA variables to parameters while declaring,
+        ### hence the program is stored under the hash of the state before
+        ### and after generation. Reruns hit the cache from either state
+        self.program_cache.put(program_hash, (prog, host_state))
+        self.program_cache.put(
+            self.get_structural_hash(simulate), (prog, host_state))
         return prog
 
+    def get_structural_hash(self, simulate: bool = False) -> str:
+        """
+        Computes a hash of everything that enters the QUA program of this
+        sequence: the sub-sequence tree, the sweep configurations, the values
+        of all parameters that are not declared in QUA, the observable options
+        and the config of the sample.
+
+        Args:
+            simulate (bool): Flag whether program is simulated
+
+        Returns:
+            str: Hex digest of the structural hash
+        """
+        measurement = self.measurement
+        sweeps = getattr(measurement, 'sweeps', [])
+        qua_params = {p for sweep in sweeps for p in sweep.parameters}
+        qua_params.update(measurement.input_stream_parameters)
+        qua_params.update(measurement.live_parameters)
+        signature = (
+            simulate,
+            measurement.continuous_mode,
+            measurement.debug_input_streams,
+            [p.full_name for p in measurement.input_stream_parameters],
+            [p.full_name for p in measurement.live_parameters],
+            [self._get_sweep_signature(sweep) for sweep in sweeps],
+            self._get_tree_signature(qua_params),
+            self.sample.config,
+        )
+        return utils.get_structural_hash(signature)
+
+    @staticmethod
+    def _get_sweep_signature(sweep) -> tuple:
+        """Returns all properties of the sweep that enter the QUA program"""
+        return (
+            [(p.full_name, np.asarray(v)) for p, v in sweep.config.items()],
+            bool(sweep.snake_scan),
+            sweep.can_be_parameterized,
+            sweep.inputs_are_streamed,
+            sweep.chunk_size,
+            sweep.permutation,
+        )
+
+    def _get_tree_signature(self, qua_params: set) -> tuple:
+        """
+        Returns the signature of this sequence and all its sub-sequences. The
+        class identity is included to catch redefined sequence classes
+
+        Args:
+            qua_params (set): Parameters that are declared as QUA variables
+        """
+        param_values = []
+        for name, param in self.parameters.items():
+            if not isinstance(param, SequenceParameter):
+                continue
+            value = param.cache.raw_value
+            declaration = (
+                param.var_type, param.scale, param.can_be_parameterized,
+                param.input_stream is not None, param.input_stream_size)
+            ### Values assigned to QUA variables during generation are skipped
+            if param in qua_params or type(value).__module__.startswith('qm.'):
+                param_values.append((name, 'qua', declaration))
+            else:
+                param_values.append((name, value, declaration))
+        observables = []
+        for gettable in self.gettables:
+            observable = getattr(gettable, 'observable', None)
+            if observable is None:
+                observables.append((gettable.name,))
+                continue
+            reduction_axis = getattr(observable.reduction_axis, 'name', None)
+            observables.append((
+                gettable.name, observable.reduction, reduction_axis,
+                observable.bin_edges, observable.packs_bits
+            ))
+        sub_sequences = [
+            submodule._get_tree_signature(qua_params)
+            for submodule in self.submodules.values()
+            if isinstance(submodule, SequenceBase)
+        ]
+        cls = type(self)
+        return (
+            self.name, cls.__module__, cls.__qualname__, id(cls),
+            param_values, observables, sub_sequences
+        )
+
     def get_qua_code(self, simulate = False):
         """
         Composes the entire qua sequence in qua code. Only execurte with
@@ -160,7 +315,7 @@ class SequenceBase(InstrumentModule):
         ### An infinite loop starting with a pause is defined to sync the QM
         ### with the client
         with qua.infinite_loop_():
-            if not simulate:
+            if not simulate and not self.measurement.continuous_mode:
                 qua.pause()
 
             ### Check requirements are set to True if the sequence is simulated
@@ -191,6 +346,7 @@ class SequenceBase(InstrumentModule):
         """ Declares all sweep variables as QUA with their correct type """
         logging.debug("Start declaring QUA variables in %s", self.name)
         for sweep in self.measurement.sweeps:
+            sweep.configure_sweep_array_sources()
             for param, setpoints in sweep.config.items():
                 if isinstance(param, SequenceParameter):
                     logging.debug("Declaring %s as %s",
@@ -201,9 +357,8 @@ class SequenceBase(InstrumentModule):
         """
         Recursively generates QUA parameter sweeps by introducing one nested QUA
         loop per swept axis. The last given sweep and its corresponding
-        setpoints are in the innermost loop.
-        TODO: Reimplement a fast version of this for non-paired parameter 
-            sweeps
+        setpoints are in the innermost loop. Parameterized sweeps share one
+        index per axis and step all their parameters by accumulation.
         Args:
             sweeps (list): list of Sweep objects
         """
@@ -234,41 +389,69 @@ class SequenceBase(InstrumentModule):
     def recursive_qua_generation(self, seq_type: str, skip_duplicates = False):
         """
         Recursively runs all QUA code stored in submodules of the given sequence
-        Differentiates between 'declare', 'stream' and `sequence`.
+        Differentiates between 'declare', 'stream' and `sequence`. The methods
+        are replayed from the precomputed plan of the given type (see
+        `get_qua_generation_plan`).
+
+        Args:
+            seq_type (str): Type of qua code containing method to look for
+            skip_duplicates (bool): Flag to skip duplicate calls of the same
+                given subsequence. Default is False
+        """
+        for qua_method in self.get_qua_generation_plan(seq_type, skip_duplicates):
+            qua_method()
+
+    def get_qua_generation_plan(
+            self, seq_type: str, skip_duplicates: bool = False) -> tuple:
+        """
+        Returns the bound `qua_<seq_type>` methods of this sequence and all its
+        sub-sequences in the order they are run during program generation. The
+        plan is compiled once by walking the sub-sequence tree and is cached
+        until a sub-sequence or submodule is added or removed.
 
         Args:
             seq_type (str): Type of qua code containing method to look for
             skip_duplicates (bool): Flag to skip duplicate calls of the same
                 given subsequence. Default is False
+
+        Returns:
+            tuple: Bound methods to be called in the given order
         """
+        key = (seq_type, skip_duplicates)
+        if key in self._qua_generation_plans:
+            return self._qua_generation_plans[key]
         method_name = f"qua_{seq_type}"
+        plan = []
         if hasattr(self, method_name):
-            getattr(self, 'qua_' + str(seq_type))()
+            plan.append(getattr(self, method_name))
 
         ### The innermost sequence is reached. Run the sequence code
         if not self.submodules:
             logging.debug(
                 "Reached low level seq running qua_%s code of %s",
                 seq_type, self.name)
-            getattr(self, method_name)()
-            return
-
-        ### If the given seqeunce has subsequences, run the recursion of those
-        if skip_duplicates:
-            sequence_list = dict.fromkeys(self.sub_sequences)
+            plan.append(getattr(self, method_name))
         else:
-            sequence_list = self.sub_sequences
-        for sub_sequence in sequence_list:
-            def next_recursion_step():
+            ### If the given seqeunce has subsequences, add their plans
+            if skip_duplicates:
+                sequence_list = dict.fromkeys(self.sub_sequences)
+            else:
+                sequence_list = self.sub_sequences
+            for sub_sequence in sequence_list:
                 if not sub_sequence.submodules:
                     if hasattr(sub_sequence, method_name):
-                        getattr(sub_sequence, method_name)()
+                        plan.append(getattr(sub_sequence, method_name))
                 else:
-                    sub_sequence.recursive_qua_generation(
-                        seq_type = seq_type,
-                        skip_duplicates = skip_duplicates
-                    )
-            next_recursion_step()
+                    plan.extend(sub_sequence.get_qua_generation_plan(
+                        seq_type, skip_duplicates))
+        self._qua_generation_plans[key] = tuple(plan)
+        return self._qua_generation_plans[key]
+
+    def _invalidate_qua_generation_plans(self) -> None:
+        """Clears the cached generation plans of self and all parents"""
+        self._qua_generation_plans = {}
+        if isinstance(self.parent, SequenceBase):
+            self.parent._invalidate_qua_generation_plans()
 
     def reset(self) -> None:
         """
@@ -289,6 +472,39 @@ class SequenceBase(InstrumentModule):
             if sub.short_name in globals():
                 del globals()[sub.short_name]
         self._sub_sequences = []
+        self._invalidate_qua_generation_plans()
+
+    def _add_element_params(
+            self, param_name: str, cfg_name: str, param_dict: dict) -> None:
+        """
+        Adds one parameter per element of an element wise parameter config in
+        a single pass. All entries of the config besides the elements are
+        shared between the parameters instead of being copied per element.
+        Element scales are taken from the dividers of the sample.
+
+        Args:
+            param_name (str): Name of the parameter without element
+            cfg_name (str): Name of the parameter in the sequence config
+            param_dict (dict): Parameter config with 'elements' key
+        """
+        shared_dict = {
+            key: value for key, value in param_dict.items()
+            if key not in ('elements', 'label')
+            }
+        divider_config = self.sample.divider_config
+        scales = {
+            element: divider_config[element]['division']
+            for element in param_dict['elements'] if element in divider_config
+            }
+        for element, value in param_dict['elements'].items():
+            element_dict = {
+                'value' : value,
+                'element' : element,
+                'scale' : scales.get(element, 1),
+                'label' : f"{element}: {param_dict['label']}",
+                **shared_dict # ensure overrides take precedence
+                }
+            self._add_param(f'{param_name}_{element}', cfg_name, element_dict)
 
     def _add_param(self, param_name: str, cfg_name: str, param_dict):
         """
@@ -305,21 +521,7 @@ class SequenceBase(InstrumentModule):
         if 'label' not in param_dict:
             param_dict['label'] = param_name
         if 'elements' in param_dict:
-            for element, value in param_dict['elements'].items():
-                scale = 1
-                if element in self.sample.divider_config:
-                    scale = self.sample.divider_config[element]['division']
-                new_param_dict = {
-                    'value' : value,
-                    'scale' : scale,
-                    'label' : f"{element}: {param_dict['label']}",
-                    }
-                param_dict_copy = copy.deepcopy(param_dict)
-                del param_dict_copy['label']
-                new_param_dict.update(param_dict_copy) # ensure overrides take precedence
-                del new_param_dict['elements']
-
-                self._add_param(f'{param_name}_{element}', cfg_name, new_param_dict)
+            self._add_element_params(param_name, cfg_name, param_dict)
         elif 'value' in param_dict:
             # set defaults and merge in changes
             appl_dict = {
@@ -405,8 +607,7 @@ class SequenceBase(InstrumentModule):
         element_dict = {element: {} for element in elements}
         for element in elements:
             for key in keys:
-                param = getattr(self, f"{key}_{element}")
-                element_dict[element][key] = param
+                element_dict[element][key] = self.find_parameter(key, element)
         return element_dict
 
     def add_subsequences_from_dict(
@@ -467,13 +668,18 @@ class SequenceBase(InstrumentModule):
         if elements is None:
             elements = self.sample.elements
         for element in elements:
-            if hasattr(self, f"{key}_{element}"):
-                parameters[element] = getattr(self, f"{key}_{element}")
+            parameter = self._lookup_parameter(key, element)
+            if parameter is None and hasattr(self, f"{key}_{element}"):
+                parameter = getattr(self, f"{key}_{element}")
+            if parameter is not None:
+                parameters[element] = parameter
         return parameters
 
     def find_parameter(self, key: str, element: str):
         """Returns parameter with a certain key for a given element"""
-        parameter = getattr(self, f"{key}_{element}")
+        parameter = self._lookup_parameter(key, element)
+        if parameter is None:
+            parameter = getattr(self, f"{key}_{element}")
         return parameter
     
     def find_parameter_from_str_path(self, path: str):
@@ -20,8 +20,10 @@ class SequenceParameter(Parameter):
     unit = ''
     qua_type = int
     input_stream = None
+    input_stream_size = None
     qua_sweeped = False
     qua_sweep_arr = None
+    qua_sweep_source = None
     qua_var = None
     value = None
     can_be_parameterized = False
@@ -118,15 +120,21 @@ class SequenceParameter(Parameter):
         self.qua_var = qua.declare(self.var_type)
         if self.can_be_parameterized:
             pass
+        elif self.qua_sweep_source is not None:
+            ### Values are derived from the sweep array of another parameter
+            pass
         elif self.input_stream is None:
             self.qua_sweep_arr = qua.declare(
                 self.var_type, value = setpoints*self.scale
             )
         else:
+            size = self.input_stream_size
+            if size is None:
+                size = int(setpoints)
             self.input_stream = qua.declare_input_stream(
                 t = self.var_type,
                 name = self.sequence_path,
-                size = int(setpoints)
+                size = size
             )
 
     def add_stream_param_to_sequence(self):
@@ -33,8 +33,15 @@ class SubSequence(SequenceBase):
 
     @property
     def measurement(self):
-        """Returns parent (sub) sequence"""
-        return self.find_measurement()
+        """
+        Returns the measurement this sub-sequence is attached to. The
+        measurement is searched once and cached since parents don't change
+        """
+        measurement = self.__dict__.get('_measurement')
+        if measurement is None:
+            measurement = self.find_measurement()
+            self._measurement = measurement
+        return measurement
 
     def find_measurement(self):
         """Recursively searches the parent sequence"""
@@ -47,6 +54,10 @@ class SubSequence(SequenceBase):
                 "Parent sequence must be of type Sequence"
                 f"Is of type {self.parent.__class__.__name__}")
 
+    def _parameter_lookup_chain(self) -> tuple:
+        """Sequences searched for parameters in order of precedence"""
+        return (self, self.measurement)
+
     def get_sequence_path(self, path: str = None) -> str:
         """Returns the path of subsequences up to the parent sequence"""
         if path is None:
@@ -7,6 +7,7 @@ from qm import qua
 from qualang_tools import loops
 from qcodes.parameters import Parameter
 from .sequence_parameter import SequenceParameter
+from . import utils
 
 class Sweep:
     """ Class characterizing a parameter sweep along one axis in the OPX """
@@ -17,7 +18,11 @@ class Sweep:
     _inputs_are_streamed = None
     _input_streams = None
     _can_be_parameterized = None
+    _is_parameterizable = None # Memoized result of _check_if_parametrizable
+    _parameterization_tolerance = 0.01 # Max deviation relative to step size
     snake_scan = False # Assume by default non snake scanning
+    chunk_size = None # Setpoints are fed via input streams in chunks if set
+    permutation = None # Order in which the setpoints are visited if shuffled
 
     def __init__(self, measurement, param_dict: dict, register_all = False):
         """
@@ -28,17 +33,38 @@ class Sweep:
             param_dict (dict): Dict with parameters as keys and arrays as
                 setpoints for sweep. If snake_scan is present in the dict,
                 use it.
+                If chunk_size is present, the setpoint arrays are fed to the
+                OPX via input streams in chunks of that size. If shuffle is
+                True (or an int seed), the setpoints are visited in random
+                order.
             register_all (bool): Whether all parameters should be registered in
                 the QCoDeS measurement
+
+        Raises:
+            ValueError: If a chunked sweep is snaked or has invalid chunk size
+                or if a shuffled sweep is snaked or streamed
         """
         self.measurement = measurement
         self.register_all = register_all
+        self.parameterization_errors = {}
+        self.geometric_parameters = {}
+        self.sweep_array_sources = {}
         self._config = param_dict
         if 'snake' in self._config: # check if the user defined the snake state
             self.snake_scan = self._config['snake']
             del self._config['snake']
+        if 'chunk_size' in self._config:
+            self.chunk_size = int(self._config.pop('chunk_size'))
+            if self.chunk_size < 1:
+                raise ValueError(
+                    f"chunk_size must be at least 1, is {self.chunk_size}")
+            if self.snake_scan:
+                raise ValueError("Chunked input stream sweeps can't be snaked")
+        shuffle = self._config.pop('shuffle', False)
         self.configure_sweep()
-        self._check_if_parametrizable()
+        if shuffle is not False and shuffle is not None:
+            self._configure_shuffle(shuffle)
+        self._is_parameterizable = self._check_if_parametrizable()
 
     @property
     def parameters(self):
@@ -75,12 +101,14 @@ class Sweep:
         """
         Whether sweep can be parameterized with start, stop and step for memory
         saving. If the user has not set this value, it will be checked by the
-        entries of the given arrays
+        entries of the given arrays. The check is memoized until the config or
+        the tolerance changes
         """
-        if self._can_be_parameterized is None:
-            return self._check_if_parametrizable()
-        else:
+        if self._can_be_parameterized is not None:
             return self._can_be_parameterized
+        if self._is_parameterizable is None:
+            self._is_parameterizable = self._check_if_parametrizable()
+        return self._is_parameterizable
 
     @can_be_parameterized.setter
     def can_be_parameterized(self, value: bool):
@@ -100,6 +128,37 @@ class Sweep:
         """Config dict for parameter sweep. Keys are params, values setpoints"""
         return self._config
 
+    @config.setter
+    def config(self, param_dict: dict) -> None:
+        """
+        Setter for config. Reconfigures the sweep with the new setpoints
+
+        Raises:
+            ValueError: If the sweep is shuffled and the length changes
+        """
+        self._config = param_dict
+        self.configure_sweep()
+        if self.shuffle and len(self.permutation) != self.length:
+            raise ValueError(
+                "The length of a shuffled sweep can't be changed")
+        self._is_parameterizable = self._check_if_parametrizable()
+
+    @property
+    def parameterization_tolerance(self) -> float:
+        """
+        Maximum deviation of a parameterized sweep from its setpoints relative
+        to the step size
+        """
+        return self._parameterization_tolerance
+
+    @parameterization_tolerance.setter
+    def parameterization_tolerance(self, tolerance: float) -> None:
+        """Setter for parameterization_tolerance"""
+        if tolerance < 0:
+            raise ValueError(f"Tolerance must be positive, is {tolerance}")
+        self._parameterization_tolerance = tolerance
+        self._is_parameterizable = None
+
     @property
     def config_to_register(self) -> list:
         """ Parameters that will be registered in QCoDeS measurement """
@@ -114,6 +173,28 @@ class Sweep:
             raise KeyError(
                 "Some of the given parameters are not within the swept params")
 
+    @property
+    def shuffle(self) -> bool:
+        """Whether the setpoints are visited in random order"""
+        return self.permutation is not None
+
+    def _configure_shuffle(self, shuffle: bool | int) -> None:
+        """
+        Draws the random order in which the OPX visits the setpoints
+
+        Args:
+            shuffle (bool | int): True or seed of the random generator
+
+        Raises:
+            ValueError: If the sweep is snaked or fed by input streams
+        """
+        if self.snake_scan:
+            raise ValueError("Shuffled sweeps can't be snaked")
+        if self.inputs_are_streamed or self.chunk_size is not None:
+            raise ValueError("Input stream sweeps can't be shuffled")
+        seed = None if shuffle is True else int(shuffle)
+        self.permutation = np.random.default_rng(seed).permutation(self.length)
+
     def configure_sweep(self) -> None:
         """Configures the sweep from the given dictionairy"""
         self.check_input_dict()
@@ -147,7 +228,15 @@ class Sweep:
                         f"or numpy.ndarray, is:  {type(value)}")
             if isinstance(self.config[parameter], int):
                 parameter.input_stream = True
+                parameter.input_stream_size = None
                 #parameter.add_stream_param_to_sequence()
+            elif self.chunk_size is not None:
+                parameter.input_stream = True
+                parameter.input_stream_size = self.chunk_size
+            else:
+                ### Drops the stream of a previous sweep over this parameter
+                parameter.input_stream = None
+                parameter.input_stream_size = None
         if all(param.input_stream is not None for param in self.parameters):
             self._inputs_are_streamed = True
         else:
@@ -231,16 +320,28 @@ class Sweep:
             bool: Whether the sweep can be parametrized
         """
         if self.inputs_are_streamed:
+            for param in self.parameters:
+                param.can_be_parameterized = False
             return False
         parameterizability_list = []
         for param in self.parameters:
             sweep_arr = self.config[param]
-            sweep_arr_differences = np.ediff1d(sweep_arr)
-            mean_step = np.mean(sweep_arr_differences)
-            if np.std(sweep_arr_differences) > np.abs(0.1*mean_step):
+            if not isinstance(sweep_arr, (list, np.ndarray)):
                 can_be_parameterized = False
             else:
-                can_be_parameterized = True
+                ### The deviation is checked on the values the OPX computes
+                sweep_arr = np.asarray(sweep_arr)*param.scale
+                _, _, step, max_error = self._fit_sweep_array(param, sweep_arr)
+                self.parameterization_errors[param] = max_error
+                tolerance = max(
+                    self.parameterization_tolerance*np.abs(step),
+                    utils.FIXED_RESOLUTION
+                    )
+                can_be_parameterized = bool(max_error <= tolerance)
+                self.geometric_parameters.pop(param, None)
+                if not (can_be_parameterized or self.snake_scan or self.shuffle):
+                    can_be_parameterized = self._check_if_geometric(
+                        param, sweep_arr)
             param.can_be_parameterized = can_be_parameterized
             parameterizability_list.append(can_be_parameterized)
         ### In case not all parameters can be parametrized, none can
@@ -267,7 +368,11 @@ class Sweep:
             if ns_sv is not None:
                 qua.assign(next_sweep.get_snake_var(), True)
 
-        if self.inputs_are_streamed:
+        if self.shuffle:
+            self._qua_shuffled_loop(next_action)
+        elif self.inputs_are_streamed and self.chunk_size is not None:
+            self._qua_chunked_input_stream_loop(next_action)
+        elif self.inputs_are_streamed:
             self._qua_input_stream_loop(next_action)
         elif self.can_be_parameterized:
             self._qua_parmetrized_loop(next_action)
@@ -311,6 +416,103 @@ class Sweep:
             else:
                 step_counter()
 
+    def _qua_chunked_input_stream_loop(self, next_action: callable) -> None:
+        """
+        Runs a qua loop over setpoints that are fed from the host in chunks of
+        `chunk_size`. The next chunk is only advanced once the current one is
+        consumed, hence the setpoint arrays can exceed the FPGA memory.
+
+        Args:
+            next_action (callable): Next action to be executed in the loop
+        """
+        logging.debug(
+            "Streaming %s with length %s in chunks of %s",
+            [param.name for param in self.parameters],
+            self.length, self.chunk_size)
+        sweep_idx_var = qua.declare(int)
+        chunk_idx_var = qua.declare(int)
+        qua.assign(sweep_idx_var, 0)
+        qua.assign(chunk_idx_var, self.chunk_size)
+        with qua.while_(sweep_idx_var < self.length):
+            with qua.if_(chunk_idx_var == self.chunk_size):
+                for param in self.parameters:
+                    qua.advance_input_stream(param.input_stream)
+                qua.assign(chunk_idx_var, 0)
+            for param in self.parameters:
+                qua.assign(param.qua_var, param.input_stream[chunk_idx_var])
+            next_action()
+
+            def step_counter():
+                qua.assign(sweep_idx_var, sweep_idx_var + 1)
+                qua.assign(chunk_idx_var, chunk_idx_var + 1)
+            if self.measurement.sweeps[0] == self:
+                self.measurement.qua_check_step_requirements(step_counter)
+            else:
+                step_counter()
+
+    def _qua_shuffled_loop(self, next_action: callable) -> None:
+        """
+        Runs a qua loop visiting the setpoints in the order of `permutation`.
+        The setpoint index is read from a QUA array and parameters are either
+        computed from it (parameterized) or read from their sweep arrays.
+
+        Args:
+            next_action (callable): Next action to be executed in the loop
+        """
+        parameters_sss = self._parameterize_sweep()
+        permutation_arr = qua.declare(int, value = self.permutation.tolist())
+        sweep_idx_var = qua.declare(int)
+        setpoint_idx_var = qua.declare(int)
+        qua.assign(sweep_idx_var, 0)
+        with qua.while_(sweep_idx_var < self.length):
+            qua.assign(setpoint_idx_var, permutation_arr[sweep_idx_var])
+            for param in self.parameters:
+                if param in parameters_sss:
+                    self._qua_calc_param_step(
+                        param, parameters_sss[param], setpoint_idx_var)
+                else:
+                    qua.assign(
+                        param.qua_var,
+                        self._qua_sweep_array_value(param, setpoint_idx_var)
+                        )
+            qua.align()
+            next_action()
+
+            def step_counter():
+                qua.assign(sweep_idx_var, sweep_idx_var + 1)
+            if self.measurement.sweeps[0] == self:
+                self.measurement.qua_check_step_requirements(step_counter)
+            else:
+                step_counter()
+
+    @property
+    def nr_chunks(self) -> int:
+        """Number of chunks of a chunked input stream sweep"""
+        if self.chunk_size is None:
+            return 0
+        return -(-self.length//self.chunk_size)
+
+    def get_stream_chunks(self, param: SequenceParameter) -> list:
+        """
+        Splits the scaled setpoints of the given parameter into the chunks that
+        are inserted into its input stream. The last chunk is padded with the
+        last setpoint since input streams have a fixed size
+
+        Args:
+            param (SequenceParameter): Parameter of this chunked sweep
+
+        Returns:
+            list: Chunks as lists of length `chunk_size`
+        """
+        setpoints = self._get_qua_sweep_array(param)
+        padding = self.nr_chunks*self.chunk_size - len(setpoints)
+        setpoints = np.concatenate([setpoints, np.repeat(setpoints[-1:], padding)])
+        if param.var_type == int:
+            setpoints = setpoints.astype(int)
+        elif param.var_type == bool:
+            setpoints = setpoints.astype(bool)
+        return [chunk.tolist() for chunk in np.split(setpoints, self.nr_chunks)]
+
     def _qua_parmetrized_loop(self, next_action: callable) -> None:
         """
         Runs a qua for loop from parametrized qua_arange. Start, stop and step
@@ -322,45 +524,116 @@ class Sweep:
         ### Define start, stop and step for all params that can be parameterized
         parameters_sss = self._parameterize_sweep()
 
-        ### Declaring sweep index variable and respective loop for sweep
+        ### Declaring sweep index variable and setting the accumulators, i.e.
+        ### the parameter variables, to the first setpoint of this pass
         sweep_idx_var = qua.declare(int)
         if self.snake_scan:
             qua.assign(self.get_snake_var(), ~self.get_snake_var())
+            parameters_sss = self._qua_set_snake_pass(parameters_sss)
+        else:
+            for param, sss in parameters_sss.items():
+                self._qua_init_param_accumulator(param, sss)
 
         qua.assign(sweep_idx_var, 0)
         with qua.while_(sweep_idx_var < self.length):
             for param in self.parameters:
                 if not param.can_be_parameterized:
                     qua.assign(
-                        param.qua_var, param.qua_sweep_arr[sweep_idx_var])
-            if not self.snake_scan:
-                for param, sss in parameters_sss.items():
-                    self._qua_calc_param_step(param, sss, sweep_idx_var, False)
-            else:
-                with qua.if_(self.get_snake_var()):
-                    for param, sss in parameters_sss.items():
-                        self._qua_calc_param_step(param, sss, sweep_idx_var, True)
-                with qua.else_():
-                    for param, sss in parameters_sss.items():
-                        self._qua_calc_param_step(param, sss, sweep_idx_var, False)
-
+                        param.qua_var,
+                        self._qua_sweep_array_value(param, sweep_idx_var)
+                        )
             qua.align()
 
             ### This is where either the whole sequence or the next sweep is run
             next_action()
 
-            ### After the sequence the parameter variable is incremented by step
+            ### After the sequence the index and all accumulators are stepped
+            def step_sweep():
+                qua.assign(sweep_idx_var, sweep_idx_var + 1)
+                for param, sss in parameters_sss.items():
+                    self._qua_step_param_accumulator(param, sss)
+            if self.measurement.sweeps[0] == self:
+                self.measurement.qua_check_step_requirements(step_sweep)
+            else:
+                step_sweep()
+
+    def _qua_set_snake_pass(self, parameters_sss: dict) -> dict:
+        """
+        Sets the first setpoint and the signed step of all parameterized
+        parameters for the upcoming pass of a snaked sweep. The direction is
+        only branched on once per pass such that the inner loop steps every
+        parameter with a single addition regardless of direction.
+
+        Args:
+            parameters_sss (dict): Start, stop and step of all parameterized
+                parameters
+
+        Returns:
+            dict: Parameter sss with the step replaced by a qua variable
+        """
+        pass_sss = {}
+        for param, sss in parameters_sss.items():
+            pass_sss[param] = {**sss, 'step': qua.declare(param.qua_type)}
+        with qua.if_(self.get_snake_var()):
             for param, sss in parameters_sss.items():
-                def step_variable():
-                    if param.can_be_parameterized:
-                        if param == self.parameters[0]:
-                            qua.assign(sweep_idx_var, sweep_idx_var + 1)
-                if self.measurement.sweeps[0] == self:
-                    self.measurement.qua_check_step_requirements(step_variable)
-                else:
-                    step_variable()
+                qua.assign(param.qua_var, sss['stop'])
+                qua.assign(pass_sss[param]['step'], -sss['step'])
+        with qua.else_():
+            for param, sss in parameters_sss.items():
+                qua.assign(param.qua_var, sss['start'])
+                qua.assign(pass_sss[param]['step'], sss['step'])
+        return pass_sss
+
+    def _qua_init_param_accumulator(self, param, sss) -> None:
+        """
+        Sets the accumulator of a parameterized parameter to its first
+        setpoint. Linear and fixed geometric parameters accumulate in their
+        own variable, int geometric ones are cast from a fixed accumulator.
+
+        Args:
+            param (SequenceParameter): Parameter to be swept
+            sss (dict): Dict with start, stop and step (parameterizing sweep).
+                Geometric sweeps have a ratio, scale and accumulator instead
+
+        Raises:
+            TypeError: If qua_type is not int or fixed
+        """
+        if param.qua_type not in (int, qua.fixed):
+            raise TypeError(
+                "Only int and fixed qua types are supported for param sweeps"
+                )
+        if 'ratio' not in sss:
+            qua.assign(param.qua_var, sss['start'])
+            return
+        qua.assign(sss['accumulator'], sss['start'])
+        if param.qua_type == int:
+            qua.assign(
+                param.qua_var,
+                qua.lib.Cast.mul_int_by_fixed(sss['scale'], sss['accumulator'])
+                )
 
-    def _qua_calc_param_step(self, param, sss, sweep_idx_var, reverse):
+    def _qua_step_param_accumulator(self, param, sss) -> None:
+        """
+        Advances the accumulator of a parameterized parameter to the next
+        setpoint with a single addition (linear) or multiplication (geometric)
+
+        Args:
+            param (SequenceParameter): Parameter to be swept
+            sss (dict): Dict with start, stop and step (parameterizing sweep).
+                Geometric sweeps have a ratio, scale and accumulator instead
+        """
+        if 'ratio' not in sss:
+            qua.assign(param.qua_var, param.qua_var + sss['step'])
+            return
+        accumulator = sss['accumulator']
+        qua.assign(accumulator, accumulator*sss['ratio'])
+        if param.qua_type == int:
+            qua.assign(
+                param.qua_var,
+                qua.lib.Cast.mul_int_by_fixed(sss['scale'], accumulator)
+                )
+
+    def _qua_calc_param_step(self, param, sss, sweep_idx_var):
         """
         Calculates the step within a parameter sweep.
         
@@ -368,7 +641,6 @@ class Sweep:
             param (SequenceParameter): Parameter to be swept
             sss (dict): Dict with start, stop and step (parameterizing sweep)
             sweep_idx_var (qua variable): Index variable for sweep
-            reverse (bool): Whether the sweep is reversed (from stop to start)
 
         Raises:
             TypeError: If qua_type is not int or fixed
@@ -376,29 +648,15 @@ class Sweep:
         Returns:
             None
         """
-        ### Note this implementation is written in a very explicit way avoiding
-        ### multiplications to save lines of code. This is done to avoid
-        ### multiplications in the FPGA code (e.g (-1)*x)
         if param.qua_type == int:
-            if not reverse:
-                qua.assign(
-                    param.qua_var, sss['start'] + sss['step']*sweep_idx_var)
-            else:
-                qua.assign(
-                    param.qua_var, sss['stop'] - sss['step']*sweep_idx_var)
+            qua.assign(
+                param.qua_var, sss['start'] + sss['step']*sweep_idx_var)
         elif param.qua_type == qua.fixed:
-            if not reverse:
-                qua.assign(
-                    param.qua_var,
-                    sss['start'] + qua.lib.Cast.mul_fixed_by_int(
-                        sss['step'], sweep_idx_var)
-                    )
-            else:
-                qua.assign(
-                    param.qua_var,
-                    sss['stop'] - qua.lib.Cast.mul_fixed_by_int(
-                        sss['step'],sweep_idx_var)
-                    )
+            qua.assign(
+                param.qua_var,
+                sss['start'] + qua.lib.Cast.mul_fixed_by_int(
+                    sss['step'], sweep_idx_var)
+                )
         else:
             raise TypeError(
                 "Only int and fixed qua types are supported for param sweeps"
@@ -410,9 +668,133 @@ class Sweep:
             logging.debug(
                 "Assigning %s to %s (loop)",
                     param.name, param.qua_sweep_arr)
-        with qua.for_each_(self.qua_variables, self.qua_sweep_arrays):
+        base_params = [
+            p for p in self.parameters if p not in self.sweep_array_sources]
+        with qua.for_each_(
+                tuple(p.qua_var for p in base_params),
+                tuple(p.qua_sweep_arr for p in base_params)):
+            for param, (base, factor, offset) in self.sweep_array_sources.items():
+                qua.assign(
+                    param.qua_var,
+                    self._qua_derive_value(base.qua_var, factor, offset)
+                    )
             next_action()
 
+    def _qua_sweep_array_value(self, param, sweep_idx_var):
+        """
+        Returns the QUA expression of the sweep array entry of the given
+        parameter at the given index. Derived parameters read the array of
+        their source parameter
+
+        Args:
+            param (SequenceParameter): Parameter with a sweep array
+            sweep_idx_var (qua variable): Index variable for sweep
+        """
+        if param not in self.sweep_array_sources:
+            return param.qua_sweep_arr[sweep_idx_var]
+        base, factor, offset = self.sweep_array_sources[param]
+        return self._qua_derive_value(
+            base.qua_sweep_arr[sweep_idx_var], factor, offset)
+
+    @staticmethod
+    def _qua_derive_value(base_value, factor, offset):
+        """Returns the QUA expression factor*base_value + offset"""
+        value = base_value
+        if factor != 1:
+            value = value*factor
+        if offset != 0:
+            value = value + offset
+        return value
+
+    def configure_sweep_array_sources(self) -> None:
+        """
+        Finds parameters whose QUA sweep arrays are identical or affine copies
+        (factor*array + offset) of the array of another parameter of this
+        sweep. Only one backing array is declared on the OPX and the values of
+        the other parameters are derived from it. Copies are only accepted if
+        the derived values deviate by less than `parameterization_tolerance` of
+        the step size from the requested setpoints.
+        """
+        self.sweep_array_sources = {}
+        bases = []
+        for param in self.parameters:
+            if not isinstance(param, SequenceParameter):
+                continue
+            param.qua_sweep_source = None
+            if param.can_be_parameterized or param.input_stream is not None:
+                continue
+            sweep_array = self._get_qua_sweep_array(param)
+            for base, base_array in bases:
+                source = self._fit_sweep_array_source(
+                    param, sweep_array, base, base_array)
+                if source is not None:
+                    logging.debug(
+                        "Deriving sweep array of %s from %s as %s*x + %s",
+                        param.name, base.name, *source)
+                    self.sweep_array_sources[param] = (base, *source)
+                    param.qua_sweep_source = base
+                    break
+            else:
+                bases.append((param, sweep_array))
+
+    def _get_qua_sweep_array(self, param: SequenceParameter) -> np.ndarray:
+        """Returns the sweep array as declared by the parameter in QUA"""
+        if param.var_type == int:
+            return np.array(self.config[param], dtype = int)*param.scale
+        return np.array(self.config[param])*param.scale
+
+    def _fit_sweep_array_source(
+            self, param: SequenceParameter, sweep_array: np.ndarray,
+            base: SequenceParameter, base_array: np.ndarray
+            ) -> tuple | None:
+        """
+        Computes factor and offset to derive the given sweep array from the
+        base array on the OPX
+
+        Args:
+            param (SequenceParameter): Parameter to be derived
+            sweep_array (np.ndarray): Scaled sweep array of the parameter
+            base (SequenceParameter): Parameter with the backing array
+            base_array (np.ndarray): Scaled sweep array of the base parameter
+
+        Returns:
+            tuple | None: Factor and offset or None if the array can not be
+                derived from the base array
+        """
+        if param.var_type != base.var_type or len(base_array) < 2:
+            return None
+        base_span = base_array[-1] - base_array[0]
+        if base_span == 0:
+            return None
+        factor = (sweep_array[-1] - sweep_array[0])/base_span
+        offset = sweep_array[0] - factor*base_array[0]
+        if param.var_type == int:
+            if factor != round(factor) or offset != round(offset):
+                return None
+            factor, offset = int(round(factor)), int(round(offset))
+            if np.array_equal(base_array*factor + offset, sweep_array):
+                return factor, offset
+            return None
+        if param.var_type != qua.fixed:
+            return None
+        factor = utils.quantize_fixed(factor)
+        offset = utils.quantize_fixed(offset)
+        if abs(factor) >= utils.FIXED_RANGE or abs(offset) >= utils.FIXED_RANGE:
+            return None
+        ### Derived values on the OPX, products are modelled as truncations
+        opx_values = utils.quantize_fixed(base_array)
+        if factor != 1:
+            opx_values = np.floor(opx_values*factor/utils.FIXED_RESOLUTION)
+            opx_values *= utils.FIXED_RESOLUTION
+        opx_values = opx_values + offset
+        max_error = np.max(np.abs(opx_values - sweep_array))
+        step = np.mean(np.abs(np.ediff1d(sweep_array)))
+        tolerance = max(
+            self.parameterization_tolerance*step, utils.FIXED_RESOLUTION)
+        if max_error > tolerance:
+            return None
+        return factor, offset
+
     def _parameterize_sweep_array(
         self, param: SequenceParameter, sweep_array: np.ndarray
         ) -> tuple[int, int, int] | tuple[float, float, float]:
@@ -426,38 +808,195 @@ class Sweep:
         Returns:
             (int, int, int) | (float, float, float): Start, stop and step
         """
+        start, stop, step, _ = self._fit_sweep_array(param, sweep_array)
+        return start, stop, step
+
+    def _fit_sweep_array(
+        self, param: SequenceParameter, sweep_array: np.ndarray) -> tuple:
+        """
+        Computes start, stop and step of the linear sweep through the first
+        and last setpoint. Start and step are rounded to the resolution of the
+        QUA type of the parameter and stop is the last setpoint the OPX
+        computes from them (start + step*(length - 1)).
+
+        Args:
+            param (SequenceParameter): Sweep-parameter
+            sweep_array (np.ndarray): Array to be parameterized
+
+        Returns:
+            tuple: Start, stop, step and the maximum deviation of the computed
+                setpoints from the given ones. The deviation is infinite if the
+                setpoints exceed the range of `qua.fixed`
+        """
+        sweep_array = np.asarray(sweep_array, dtype = float)
+        length = len(sweep_array)
         start = sweep_array[0]
-        stop = sweep_array[-1]
-        step = np.mean(np.ediff1d(sweep_array))
-        step *= 0.999
+        step = 0.
+        if length > 1:
+            step = (sweep_array[-1] - start)/(length - 1)
         if param.var_type == int:
-            start, stop = int(sweep_array[0]), int(sweep_array[-1] + step)
-            step = round(step)
-
-        ### This can probably done more elegantly
-        length_of_array = len(np.arange(start, stop, step))
-        while length_of_array != self.length:
-            if length_of_array > self.length:
-                stop -= step
-            elif length_of_array < self.length:
-                stop += step
-            length_of_array = len(np.arange(start, stop, step))
-
-        if not length_of_array == self.length:
-            raise ValueError(
-                "Sweep array must have same length as sweep length or one more."
-                f"Is {length_of_array}, should be {self.length}"
-                )
-        return start, stop, step
+            start, step = int(round(start)), int(round(step))
+        else:
+            start = utils.quantize_fixed(start)
+            step = utils.quantize_fixed(step)
+        stop = start + step*(length - 1)
+        opx_setpoints = start + step*np.arange(length)
+        max_error = float(np.max(np.abs(opx_setpoints - sweep_array)))
+        if param.var_type != int:
+            if np.any(np.abs(opx_setpoints) >= utils.FIXED_RANGE):
+                max_error = np.inf
+        return start, stop, step, max_error
+
+    def _check_if_geometric(
+            self, param: SequenceParameter, sweep_array: np.ndarray) -> bool:
+        """
+        Checks whether the sweep array is a geometric (e.g logarithmically
+        spaced) sequence the OPX can compute by repeated multiplication. If so,
+        start and ratio are stored in `geometric_parameters` and the registered
+        setpoints are replaced by the values the OPX computes.
+
+        Args:
+            param (SequenceParameter): Sweep-parameter
+            sweep_array (np.ndarray): Scaled setpoints of the parameter
+
+        Returns:
+            bool: Whether the sweep can be computed geometrically
+        """
+        fit = self._fit_geometric_sweep_array(param, sweep_array)
+        if fit is None:
+            return False
+        sss, opx_setpoints = fit
+        ### The tolerance is relative to the local step size of the sweep
+        errors = np.abs(opx_setpoints - sweep_array)
+        local_steps = np.abs(opx_setpoints*(sss['ratio'] - 1))
+        min_tolerance = 1 if param.var_type == int else utils.FIXED_RESOLUTION
+        tolerances = np.maximum(
+            self.parameterization_tolerance*local_steps, min_tolerance)
+        if np.any(errors > tolerances):
+            return False
+        self.parameterization_errors[param] = float(np.max(errors))
+        self.geometric_parameters[param] = sss
+        if param in self._config_to_register:
+            ### The host setpoints match the computed values exactly
+            setpoints = param.convert_to_real_units(opx_setpoints/param.scale)
+            self._config_to_register[param] = setpoints*param.scale
+        return True
+
+    @classmethod
+    def _fit_geometric_sweep_array(
+        cls, param: SequenceParameter, sweep_array: np.ndarray
+        ) -> tuple[dict, np.ndarray] | None:
+        """
+        Computes start and ratio of a geometric sequence through the given
+        setpoints and the setpoints the OPX computes from them. The OPX
+        multiplies a `qua.fixed` accumulator by the ratio in every step. Int
+        parameters are rescaled by a power of two to fit the accumulator into
+        the `qua.fixed` range and are truncated to int once per step. The
+        ratio is bisected on the fixed point grid such that the last computed
+        setpoint matches the last given one.
+
+        Args:
+            param (SequenceParameter): Sweep-parameter
+            sweep_array (np.ndarray): Array to be parameterized
+
+        Returns:
+            tuple | None: Dict with start (accumulator), stop, ratio and scale
+                and the setpoints on the OPX. None if the array can not be
+                geometric or exceeds the `qua.fixed` range
+        """
+        sweep_array = np.asarray(sweep_array, dtype = float)
+        length = len(sweep_array)
+        if length < 3 or np.any(sweep_array == 0):
+            return None
+        if np.any(np.sign(sweep_array) != np.sign(sweep_array[0])):
+            return None
+        scale = 1
+        if param.var_type == int:
+            max_value = np.max(np.abs(sweep_array))
+            scale = 2**max(0, int(np.ceil(np.log2(max_value/4))))
+        start = utils.quantize_fixed(sweep_array[0]/scale)
+        if start == 0 or np.max(np.abs(sweep_array))/scale >= utils.FIXED_RANGE:
+            return None
+        def opx_setpoints(ratio):
+            return cls._get_geometric_opx_setpoints(
+                start, ratio, scale, length, param.var_type == int)
+
+        ### The last setpoint grows monotonically with the ratio
+        target = np.abs(sweep_array[-1])
+        low = 1
+        high = int((utils.FIXED_RANGE - utils.FIXED_RESOLUTION)/utils.FIXED_RESOLUTION)
+        if np.abs(sweep_array[-1]) < np.abs(sweep_array[0]):
+            high = int(1/utils.FIXED_RESOLUTION)
+        else:
+            low = int(1/utils.FIXED_RESOLUTION)
+        while high - low > 1:
+            mid = (low + high)//2
+            if np.abs(opx_setpoints(mid*utils.FIXED_RESOLUTION)[-1]) >= target:
+                high = mid
+            else:
+                low = mid
+        ratio = min(
+            (low*utils.FIXED_RESOLUTION, high*utils.FIXED_RESOLUTION),
+            key = lambda r: np.abs(np.abs(opx_setpoints(r)[-1]) - target)
+            )
+        if ratio == 1:
+            return None
+        setpoints = opx_setpoints(ratio)
+        sss = {'start': start, 'stop': setpoints[-1], 'ratio': ratio, 'scale': scale}
+        return sss, setpoints
+
+    @staticmethod
+    def _get_geometric_opx_setpoints(
+        start: float, ratio: float, scale: int, length: int, is_int: bool
+        ) -> np.ndarray:
+        """
+        Models the setpoints of a geometric sweep on the OPX. Products of
+        `qua.fixed` values and casts to int are modelled as truncations.
+
+        Args:
+            start (float): Start value of the fixed point accumulator
+            ratio (float): Ratio between consecutive setpoints
+            scale (int): Factor between accumulator and int setpoints
+            length (int): Number of setpoints
+            is_int (bool): Whether the parameter is an int
+
+        Returns:
+            np.ndarray: Setpoints the OPX computes
+        """
+        accumulator = np.empty(length)
+        accumulator[0] = start
+        for i in range(1, length):
+            accumulator[i] = accumulator[i - 1]*ratio
+            accumulator[i] = np.floor(accumulator[i]/utils.FIXED_RESOLUTION)
+            accumulator[i] *= utils.FIXED_RESOLUTION
+        if is_int:
+            return np.trunc(accumulator*scale)
+        return accumulator
 
     def _parameterize_sweep(self):
         """
         Parameterizes the sweep array in start, stop, step for all paramerters
-        with sweep arrays with equal step size
+        with sweep arrays with equal step size. Geometric sweeps get start,
+        ratio and a QUA accumulator variable instead
         """
         parameters_sss = {}
         for param in self.parameters:
-            if param.can_be_parameterized:
+            if param.can_be_parameterized and param in self.geometric_parameters:
+                parameters_sss[param] = dict(self.geometric_parameters[param])
+                if param.qua_type == int:
+                    parameters_sss[param]['accumulator'] = qua.declare(qua.fixed)
+                else:
+                    parameters_sss[param]['accumulator'] = param.qua_var
+                warnings.warn(
+                    f"\n\tYour input array of length {self.length} "
+                    f"for {param.name} will be computed geometrically with\n\t"
+                    f"start {parameters_sss[param]['start']}, ratio "
+                    f"{parameters_sss[param]['ratio']}. Max deviation from "
+                    f"setpoints: {self.parameterization_errors.get(param)}"
+                    " \n\tCheck output!",
+                    category=ResourceWarning
+                    )
+            elif param.can_be_parameterized:
                 start, stop, step = self._parameterize_sweep_array(
                     param, self.config[param]*param.scale)
                 parameters_sss[param] = {
@@ -465,12 +1004,12 @@ class Sweep:
                     'stop': stop,
                     'step': step
                     }
-                length_of_array = len(np.arange(start, stop, step))
                 warnings.warn(
-                    f"\n\tYour input array of length {length_of_array} "
+                    f"\n\tYour input array of length {self.length} "
                     f"for {param.name} will be parametrized with\n\t"
-                    f"start {start}, step {step}, stop {stop}"
-                    f" of length {length_of_array}. \n\tCheck output!",
+                    f"start {start}, step {step}, stop {stop}. Max deviation"
+                    f" from setpoints: {self.parameterization_errors.get(param)}"
+                    " \n\tCheck output!",
                     category=ResourceWarning
                     )
         return parameters_sss
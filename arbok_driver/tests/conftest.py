@@ -1,7 +1,12 @@
 import pytest 
 
-from arbok_driver import ArbokDriver, Sample, SubSequence, Sequence
+from arbok_driver import ArbokDriver, Sample, SubSequence, Measurement
+from arbok_driver.parameter_types import Voltage
+from arbok_driver.tests.all_the_qua import AllTheQua
 from arbok_driver.tests.dummy_opx_config import dummy_qua_config
+from arbok_driver.tests.qm_config.opx1000 import config
+from arbok_driver.tests.var_readout import VarReadout
+from arbok_driver.tests.var_readout_config import var_readout_config
 
 opx_scale = 2
 divider_config = {
@@ -32,7 +37,7 @@ def arbok_driver(dummy_sample):
 @pytest.fixture
 def dummy_sequence(arbok_driver, dummy_sample):
     """Returns dummy sequence instance"""
-    sequence = Sequence(arbok_driver, 'dummy_sequence', dummy_sample)
+    sequence = Measurement(arbok_driver, 'dummy_sequence', dummy_sample)
     return sequence
     sequence.__del__()
     del sequence
@@ -61,3 +66,23 @@ def sub_sequence_2(dummy_sequence, dummy_sample):
     seq2 = SubSequence(dummy_sequence, 'sub_seq2', dummy_sample, config_2)
     yield seq2
     seq2.__del__()
+
+@pytest.fixture
+def measurement():
+    """
+    Returns a measurement on the opx1000 config with a `v_home` voltage on
+    element_a, element_b and element_c and the read sequence `atq` declaring
+    QUA variables. The driver is closed after the test
+    """
+    sample = Sample('opx1000_sample', config, {})
+    driver = ArbokDriver('opx1000_driver', sample)
+    measurement = Measurement(
+        driver, 'measurement', sample, {'parameters': {'v_home': {
+            'type': Voltage, 'elements': {
+                'element_a': 0, 'element_b': 0, 'element_c': 0}}}}
+        )
+    AllTheQua(
+        measurement, 'atq', sample, var_readout_config,
+        available_abstract_readouts = {'var_readout': VarReadout})
+    yield measurement
+    driver.close()
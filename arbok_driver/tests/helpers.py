@@ -1,3 +1,5 @@
+import re
+from types import SimpleNamespace
 import numpy as np
 
 def set_sweeps_args(sequence) -> list:
@@ -40,3 +42,70 @@ def compare_qua_programs(qp1, qp2) -> list:
     else:
         print('identical programs')
     return lines
+
+def run_qua_script(
+        script: str, shot_var, recorded_vars: list, nr_batches: int = 1
+        ) -> np.ndarray:
+    """
+    Runs the loops of a generated QUA script in python to check the values
+    the OPX computes. Only declarations, assignments, while loops and if/else
+    branches are evaluated, all other statements are ignored. Fixed point
+    variables are truncated to the 4.28 resolution after each assignment.
+
+    Args:
+        script (str): Generated QUA script
+        shot_var (QuaVariable): Shot counter of the measurement
+        recorded_vars (list): QUA variables recorded whenever a shot is saved
+        nr_batches (int): Number of iterations of the infinite loop
+
+    Returns:
+        np.ndarray: Recorded values with shape (nr_shots, len(recorded_vars))
+    """
+    records = []
+    namespace = {
+        '_fixed': lambda value: np.floor(value*2**28)/2**28,
+        '_record': lambda: records.append(
+            [namespace[str(var)] for var in recorded_vars]),
+        'Cast': SimpleNamespace(
+            mul_int_by_fixed = lambda i, f: int(np.trunc(i*f)),
+            mul_fixed_by_int = lambda f, i: f*i,
+            ),
+        }
+    fixed_vars = set()
+    lines = []
+    for line in script.split('\n'):
+        indent = line[:len(line) - len(line.lstrip())]
+        statement = line.strip()
+        if statement.startswith('with stream_processing()'):
+            break
+        declaration = re.match(
+            r'(\w+) = declare\((\w+), (?:value=)?(.*)\)$', statement)
+        assignment = re.match(r'assign\((\w+)(\[.*?\])?, (.*)\)$', statement)
+        if statement == 'with program() as prog:':
+            statement = 'if True:'
+        elif statement == 'with infinite_loop_():':
+            statement = f'for _ in range({nr_batches}):'
+        elif statement.startswith(f'save({shot_var},'):
+            statement = '_record()'
+        elif declaration is not None:
+            name, qua_type, value = declaration.groups()
+            if qua_type == 'fixed':
+                fixed_vars.add(name)
+            statement = f'{name} = {value or 0}'
+        elif assignment is not None:
+            name, index, value = assignment.groups()
+            if name in fixed_vars:
+                value = f'_fixed({value})'
+            statement = f'{name}{index or ""} = {value}'
+        elif statement.startswith(('with while_(', 'with if_(')):
+            statement = re.sub(
+                r'^with (while|if)_\((.*)\):$', r'\1 \2:', statement)
+        elif statement == 'with else_():':
+            statement = 'else:'
+        elif statement.endswith(':'):
+            raise NotImplementedError(f"Unsupported QUA block {statement}")
+        elif statement:
+            statement = 'pass'
+        lines.append(indent + statement)
+    exec('\n'.join(lines), namespace)
+    return np.array(records)
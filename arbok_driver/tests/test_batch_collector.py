@@ -0,0 +1,57 @@
+"""Module testing the BatchCollector class"""
+from types import SimpleNamespace
+import numpy as np
+
+from arbok_driver.batch_collector import BatchCollector
+from arbok_driver.wait_strategy import BackoffWaitStrategy
+
+class MockGettable:
+    """Mock gettable returning a constant array"""
+    def __init__(self, value, batch_counter):
+        self.value = value
+        self.buffer = 'buffer'
+        self.batch_counter = batch_counter
+        self.nr_registered_results = 0
+        self.nr_fetches = 0
+
+    def fetch_raw_batch(self):
+        self.nr_fetches += 1
+        return self.nr_fetches - 1, np.full(4, self.value)
+
+    def reshape_batch(self, raw, batch_index):
+        return raw.reshape((2, 2))
+
+class MockCounter:
+    """Mock shot counter that reports a full batch"""
+    def __init__(self):
+        self.nr_fetches = 0
+
+    def fetch_all(self):
+        self.nr_fetches += 1
+        return np.array([4])
+
+def test_batch_collector_waits_once_and_fetches_all() -> None:
+    """Tests that all gettables are fetched after a single wait"""
+    counter = MockCounter()
+    gettables = [MockGettable(i, counter) for i in range(5)]
+    measurement = SimpleNamespace(
+        name = 'dummy_measurement',
+        gettables = gettables,
+        sweep_size = 4,
+        continuous_mode = False,
+        wait_strategy = BackoffWaitStrategy(max_poll_rate = 0),
+        driver = SimpleNamespace(
+            qm_job = SimpleNamespace(is_paused = lambda: True))
+    )
+    collector = BatchCollector(measurement, max_workers = 2)
+    results = collector.collect()
+    assert counter.nr_fetches == 1
+    assert list(results.keys()) == gettables
+    for i, gettable in enumerate(gettables):
+        assert np.all(results[gettable] == i)
+        assert gettable.nr_fetches == 1
+        assert gettable.nr_registered_results == 4
+    collector.collect()
+    assert collector.nr_registered_results == 8
+    collector.reset()
+    assert collector.batch_counter is None
@@ -0,0 +1,159 @@
+"""Module testing the BatchPipeline class"""
+import logging
+import threading
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import qcodes as qc
+from qcodes.parameters import Parameter
+from qcodes.validators import Arrays
+
+from arbok_driver.batch_pipeline import BatchPipeline
+from arbok_driver.measurement_helpers import (
+    _update_writer_progress, create_measurement_loop)
+from rich.progress import Progress
+
+class MockGettable:
+    """Mock gettable reshaping flat batches into (2, 2) arrays"""
+    def reshape_batch(self, raw, batch_index):
+        return raw.reshape((2, 2)) + 100*batch_index
+
+class MockDataSaver:
+    """Mock datasaver recording all results"""
+    def __init__(self, release = None):
+        self.results = []
+        self.release = release
+
+    def add_result(self, *result_args):
+        if self.release is not None:
+            self.release.wait()
+        self.results.append(result_args)
+
+def test_batch_pipeline_keeps_setpoints_paired() -> None:
+    """Tests that every batch is saved with the setpoints it was put with"""
+    gettable = MockGettable()
+    datasaver = MockDataSaver()
+    with BatchPipeline(datasaver, max_pending_batches = 2) as pipeline:
+        setpoints = {'v': ('v', None)}
+        for i in range(5):
+            setpoints['v'] = ('v', i)
+            pipeline.put(
+                {gettable: (i, np.arange(4))}, list(setpoints.values()))
+    assert pipeline.nr_processed_batches == 5
+    for i, result_args in enumerate(datasaver.results):
+        assert result_args[1] == ('v', i)
+        assert result_args[0][0] is gettable
+        assert result_args[0][1][0, 0] == 100*i
+
+def test_batch_pipeline_applies_backpressure() -> None:
+    """Tests that `put` blocks if the worker falls behind"""
+    release = threading.Event()
+    gettable = MockGettable()
+    pipeline = BatchPipeline(MockDataSaver(release), max_pending_batches = 1)
+    ### One batch in the worker and one in the queue fill the pipeline
+    for i in range(2):
+        pipeline.put({gettable: (i, np.arange(4))}, [])
+    blocked_put = threading.Thread(
+        target = pipeline.put, args = ({gettable: (2, np.arange(4))}, []))
+    blocked_put.start()
+    blocked_put.join(timeout = 0.3)
+    assert blocked_put.is_alive()
+    release.set()
+    blocked_put.join(timeout = 2)
+    assert not blocked_put.is_alive()
+    pipeline.close()
+    assert pipeline.nr_processed_batches == 3
+
+def test_batch_pipeline_raises_worker_errors() -> None:
+    """Tests that errors of the worker are raised in the measurement loop"""
+    pipeline = BatchPipeline(MockDataSaver())
+    pipeline.put({MockGettable(): (0, np.arange(3))}, [])
+    with pytest.raises(RuntimeError):
+        pipeline.close()
+
+def test_batch_pipeline_reports_queue_depth_and_latency() -> None:
+    """Tests the recorded queue depths and write latencies"""
+    release = threading.Event()
+    gettable = MockGettable()
+    pipeline = BatchPipeline(MockDataSaver(release), max_pending_batches = 3)
+    for i in range(3):
+        pipeline.put({gettable: (i, np.arange(4))}, [])
+    release.set()
+    pipeline.close()
+    assert pipeline.max_queue_depth >= 1
+    assert len(pipeline.write_latencies) == 3
+    assert all(
+        latency >= duration for latency, duration in zip(
+            pipeline.write_latencies, pipeline.write_durations))
+    assert pipeline.mean_write_latency >= pipeline.write_latencies[-1]/3
+
+def test_writer_progress_shows_queue_and_latency() -> None:
+    """Tests the writer progress bar updated after each saved batch"""
+    progress_tracker = Progress()
+    progress_bars = {
+        'total_progress': progress_tracker.add_task("total", total = 2),
+        'writer': progress_tracker.add_task("writer", total = None)
+    }
+    pipeline = BatchPipeline(MockDataSaver(), max_pending_batches = 3)
+    pipeline.on_batch_done = lambda: _update_writer_progress(
+        pipeline, progress_bars, progress_tracker)
+    for i in range(2):
+        pipeline.put({MockGettable(): (i, np.arange(4))}, [])
+    pipeline.close()
+    tasks = {task.id: task for task in progress_tracker.tasks}
+    assert tasks[progress_bars['total_progress']].completed == 2
+    description = tasks[progress_bars['writer']].description
+    assert "Writer queue 0/3" in description
+    assert f"{1e3*pipeline.last_write_latency:.1f} ms" in description
+
+class ArrayGettable(Parameter):
+    """Qcodes array parameter reshaping batches like a GettableParameter"""
+    def reshape_batch(self, raw, batch_index):
+        return raw + 100*batch_index
+
+class MockRawCollector:
+    """Mock batch collector returning raw batches with their index"""
+    def __init__(self, gettable):
+        self.gettable = gettable
+        self.nr_batches = 0
+
+    def collect_raw(self, progress_bar = None):
+        self.nr_batches += 1
+        return {self.gettable: (self.nr_batches - 1, np.arange(3.))}
+
+@pytest.fixture
+def qcodes_database(tmp_path):
+    """Creates a temporary qcodes database and restores the previous one"""
+    db_location = qc.config.core.db_location
+    qc.initialise_or_create_database_at(str(tmp_path/'pipeline.db'))
+    yield qc.load_or_create_experiment('pipeline', 'pipeline_sample')
+    qc.config.core.db_location = db_location
+
+@pytest.mark.filterwarnings("ignore:The specified write period")
+def test_pipelined_loop_writes_to_qcodes_dataset(
+        qcodes_database, caplog) -> None:
+    """Tests that the worker thread can flush into a real qcodes dataset"""
+    gettable = ArrayGettable('g', get_cmd = None, vals = Arrays(shape = (3,)))
+    setpoint = Parameter('v', set_cmd = None, initial_value = 0)
+    sequence = SimpleNamespace(
+        gettables = [gettable],
+        sweep_size = 3,
+        continuous_mode = False,
+        streamed_sweeps = [],
+        live_parameters = [],
+        driver = SimpleNamespace(qm_job = SimpleNamespace(resume = lambda: None)),
+        batch_collector = MockRawCollector(gettable)
+        )
+    measurement = qc.Measurement(exp = qcodes_database)
+    ### Every add_result flushes to the database
+    measurement.write_period = 1e-3
+    with caplog.at_level(logging.INFO):
+        dataset = create_measurement_loop(
+            sequence, measurement, [{setpoint: np.arange(4)}],
+            pipelined = True)(lambda: None)()
+    assert "Could not commit" not in caplog.text
+    assert "Writer saved 4 batches" in caplog.text
+    data = dataset.get_parameter_data()['g']
+    assert np.array_equal(
+        data['g'], np.arange(3.) + 100*np.arange(4)[:, None])
+    assert np.array_equal(data['v'][:, 0], np.arange(4))
@@ -0,0 +1,47 @@
+"""Module testing the bit packing of boolean observables"""
+import math
+import numpy as np
+
+from arbok_driver.utils import get_nr_packed_words, unpack_bits
+
+def pack_like_opx(bits: np.ndarray) -> np.ndarray:
+    """Packs bits into signed 32-bit words as done on the FPGA"""
+    words = []
+    for start in range(0, len(bits), 32):
+        word = 0
+        for i, bit in enumerate(bits[start:start + 32]):
+            word |= int(bit) << i
+        words.append(word - (1 << 32) if word >= 1 << 31 else word)
+    return np.array(words, dtype = np.int64)
+
+def test_unpack_bits_round_trip() -> None:
+    """Tests unpacking including sign bits and a partial last word"""
+    rng = np.random.default_rng(0)
+    for nr_bits in (1, 31, 32, 33, 100):
+        bits = rng.integers(0, 2, nr_bits).astype(bool)
+        bits[-1] = True
+        words = pack_like_opx(bits)
+        assert words.size == get_nr_packed_words(nr_bits)
+        unpacked = unpack_bits(words, nr_bits)
+        assert unpacked.dtype == np.bool_
+        assert np.array_equal(unpacked, bits)
+    assert np.array_equal(
+        unpack_bits(np.array([-1]), 32), np.ones(32, dtype = bool))
+
+def test_bool_observable_generates_packing_loop(measurement) -> None:
+    """Tests the QUA packing loop and packed buffer size of a bool observable"""
+    observable = next(iter(
+        measurement.atq.var_readouts['var_readout'].observables.values()))
+    assert not observable.pack_bits
+    observable.qua_type = bool
+    observable.pack_bits = True
+    measurement.set_sweeps(
+        {'v_home_element_a': np.linspace(0, 0.1, 10)},
+        {'v_home_element_b': np.linspace(0, 0.1, 7)})
+    measurement.register_gettables(observable.gettable)
+    script = measurement.get_qua_program_as_str()
+    assert '&31)' in script and '<<' in script
+    assert '==69)' in script
+    assert f'.buffer({get_nr_packed_words(70)}).save(' in script
+    assert observable.gettable.bit_packed
+    assert observable.gettable.fetch_size == math.ceil(70/32)
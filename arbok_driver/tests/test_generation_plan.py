@@ -0,0 +1,43 @@
+"""Module testing the precomputed QUA generation plans"""
+import pytest
+
+from arbok_driver import ArbokDriver, Sample, SubSequence
+from arbok_driver.measurement import Measurement
+from arbok_driver.tests.dummy_opx_config import dummy_qua_config
+
+class RecordingSequence(SubSequence):
+    """Sub sequence recording the calls of its qua methods"""
+    calls = []
+
+    def qua_sequence(self):
+        self.calls.append(self.short_name)
+
+@pytest.fixture
+def measurement():
+    """Returns measurement with a nested tree of recording sub sequences"""
+    sample = Sample('plan_sample', dummy_qua_config, {})
+    driver = ArbokDriver('plan_driver', sample)
+    measurement = Measurement(driver, 'plan_measurement', sample)
+    outer = RecordingSequence(measurement, 'outer', sample)
+    RecordingSequence(outer, 'child1', sample)
+    RecordingSequence(outer, 'child2', sample)
+    RecordingSequence(measurement, 'leaf', sample)
+    RecordingSequence.calls.clear()
+    yield measurement
+    driver.close()
+
+def test_plan_replays_tree_in_order(measurement) -> None:
+    """Tests that the plan contains all methods in the generation order"""
+    measurement.recursive_qua_generation('sequence')
+    assert RecordingSequence.calls == ['outer', 'child1', 'child2', 'leaf']
+    plan = measurement.get_qua_generation_plan('sequence')
+    assert plan is measurement.get_qua_generation_plan('sequence')
+
+def test_plan_is_invalidated_by_new_sub_sequence(measurement) -> None:
+    """Tests that adding a nested sub sequence updates the parents plans"""
+    plan = measurement.get_qua_generation_plan('sequence')
+    RecordingSequence(measurement.outer.child2, 'grandchild', measurement.sample)
+    assert measurement.get_qua_generation_plan('sequence') is not plan
+    measurement.recursive_qua_generation('sequence')
+    assert RecordingSequence.calls == [
+        'outer', 'child1', 'child2', 'grandchild', 'leaf']
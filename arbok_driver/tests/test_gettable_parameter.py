@@ -0,0 +1,154 @@
+"""Module testing the GettableParameter class"""
+from types import SimpleNamespace
+import pytest
+import numpy as np
+from qcodes.parameters import Parameter
+from qcodes.validators import Arrays
+
+from arbok_driver import GettableParameter
+
+class MockBuffer:
+    """Mock OPX result handle returning the given arrays one after another"""
+    def __init__(self, *arrays):
+        self.arrays = list(arrays)
+
+    def fetch_all(self):
+        if len(self.arrays) > 1:
+            return self.arrays.pop(0)
+        return self.arrays[0]
+
+class MockHistogramBuffer(MockBuffer):
+    """Mock histogram result handle counting the emitted histograms"""
+    def __init__(self, *arrays):
+        super().__init__(*arrays)
+        self.nr_emitted = 1
+
+    def fetch_all(self):
+        return self.arrays[self.nr_emitted - 1]
+
+    def count_so_far(self):
+        return self.nr_emitted
+
+@pytest.fixture
+def gettable() -> GettableParameter:
+    gettable = GettableParameter(
+        'dummy_gettable',
+        sequence = SimpleNamespace(continuous_mode = False),
+        vals = Arrays(shape = (1,))
+        )
+    gettable.batch_size = 6
+    gettable.shape = (2, 3)
+    return gettable
+
+def test_fetch_preserves_dtype_and_reuses_buffer(gettable) -> None:
+    """Tests that int and bool streams keep their dtype in one buffer"""
+    gettable.buffer = MockBuffer(
+        np.arange(6, dtype = np.int64), np.arange(6, 12, dtype = np.int64))
+    first = gettable._fetch_opx_buffer()
+    assert first.dtype == np.int64
+    second = gettable._fetch_opx_buffer()
+    assert second is first
+    assert np.array_equal(second, np.arange(6, 12))
+
+    gettable.reset_measuerement_attributes()
+    gettable.batch_size = 6
+    gettable.buffer = MockBuffer(np.array([True, False]*3))
+    assert gettable._fetch_opx_buffer().dtype == np.bool_
+
+def test_reset_drops_batch_buffers(gettable) -> None:
+    """Tests that a new job with another size and dtype gets fresh buffers"""
+    gettable.buffer = MockBuffer(np.arange(6, dtype = np.int64))
+    gettable.fetch_batch()
+    assert gettable.nr_fetched_batches == 1
+    gettable.reset()
+    assert gettable.nr_fetched_batches == 0
+    gettable.batch_size = 4
+    gettable.shape = (4,)
+    gettable.buffer = MockBuffer(np.linspace(0, 1, 4))
+    buffer_val = gettable._fetch_opx_buffer()
+    assert buffer_val.dtype == np.float64
+    assert np.allclose(buffer_val, np.linspace(0, 1, 4))
+
+def test_consecutive_gets_do_not_alias() -> None:
+    """Tests that a result of `get` is not overwritten by the next batch"""
+    setpoints = tuple(
+        Parameter(f"setpoints_{size}", vals = Arrays(shape = (size,)),
+                  get_cmd = lambda size = size: np.arange(size))
+        for size in (2, 3))
+    gettable = GettableParameter(
+        'aliasing_gettable',
+        sequence = SimpleNamespace(
+            continuous_mode = False,
+            wait_strategy = SimpleNamespace(
+                wait = lambda **kwargs: kwargs['batch_size'])),
+        vals = Arrays(shape = (2, 3)),
+        setpoints = setpoints
+        )
+    for index_maps in (None, (np.array([0, 1, 2, 5, 4, 3]),)*2):
+        gettable.reset()
+        gettable.batch_size = 6
+        gettable.shape = (2, 3)
+        gettable.index_maps = index_maps
+        gettable.buffer = MockBuffer(np.arange(6.), np.arange(6., 12.))
+        first = gettable.get()
+        second = gettable.get()
+        assert not np.shares_memory(first, second)
+        assert np.array_equal(first.ravel()[:3], [0, 1, 2])
+        assert np.array_equal(second.ravel()[:3], [6, 7, 8])
+        assert gettable.cache.get(get_if_invalid = False) is second
+
+def test_fetch_incomplete_batch_and_float32(gettable) -> None:
+    """Tests incomplete batches and optional float32 down-conversion"""
+    gettable.downcast_to_float32 = True
+    gettable.buffer = MockBuffer(np.zeros(3), np.linspace(0, 1, 6))
+    assert gettable._fetch_opx_buffer() is None
+    buffer_val = gettable._fetch_opx_buffer()
+    assert buffer_val.dtype == np.float32
+    assert np.allclose(buffer_val, np.linspace(0, 1, 6))
+
+def test_reshape_with_index_map(gettable) -> None:
+    """Tests unfolding of a snaked batch into the sweep shape"""
+    gettable.index_maps = (np.array([0, 1, 2, 5, 4, 3]),)*2
+    reshaped = gettable.reshape_batch(np.arange(6, dtype = np.int32), 0)
+    assert reshaped.dtype == np.int32
+    assert np.array_equal(reshaped, [[0, 1, 2], [5, 4, 3]])
+    with pytest.raises(ValueError):
+        gettable.reshape_batch(np.arange(5), 0)
+
+def test_fetch_reduced_batch(gettable) -> None:
+    """Tests fetching a batch that was reduced along one axis on the server"""
+    gettable.batch_size = 24
+    gettable.buffer = MockBuffer(np.arange(6.).reshape(2, 3))
+    assert gettable.result_size == 6
+    batch_index, buffer_val = gettable.fetch_raw_batch()
+    assert buffer_val.shape == (6,)
+    assert np.array_equal(
+        gettable.reshape_batch(buffer_val, batch_index),
+        np.arange(6.).reshape(2, 3))
+
+def test_fetch_histogram_counts_per_batch(gettable) -> None:
+    """Tests that cumulative server histograms are split into batch counts"""
+    gettable.bin_centers = np.array([-0.5, 0.5])
+    gettable.shape = (2,)
+    gettable.nr_batch_buffers = 2
+    gettable.buffer = MockHistogramBuffer(
+        np.array([[3, 1]]), np.array([[4, 6]]), np.array([[9, 9]]))
+    assert np.array_equal(gettable.fetch_batch(), [3, 1])
+    ### The second histogram is not emitted yet, the first one is stale
+    gettable.buffer.nr_emitted = 1
+    assert gettable._fetch_opx_buffer() is None
+    gettable.buffer.nr_emitted = 2
+    assert np.array_equal(gettable.fetch_batch(), [1, 5])
+    gettable.buffer.nr_emitted = 3
+    with pytest.raises(RuntimeError):
+        gettable.fetch_batch()
+    gettable.reset()
+    assert gettable._previous_histogram is None
+
+def test_fetch_bit_packed_batch(gettable) -> None:
+    """Tests that packed words are unpacked into a bool batch"""
+    gettable.bit_packed = True
+    gettable.buffer = MockBuffer(np.array([0b101101]))
+    buffer_val = gettable._fetch_opx_buffer()
+    assert buffer_val.dtype == np.bool_
+    assert np.array_equal(buffer_val, [True, False, True, True, False, True])
@@ -0,0 +1,44 @@
+"""Module testing live parameters fed by input streams"""
+import numpy as np
+import pytest
+
+def set_sweeps(measurement) -> None:
+    """Sweeps element_a and registers the first gettable of the read sequence"""
+    measurement.set_sweeps(
+        {measurement.v_home_element_a: np.linspace(0, 0.1, 5)})
+    measurement.register_gettables(measurement.atq.gettables[0])
+
+def test_live_stream_is_advanced_after_pause(measurement) -> None:
+    """Tests that the live stream is read into the declared variable per batch"""
+    param = measurement.v_home_element_c
+    measurement.add_live_parameter(param)
+    set_sweeps(measurement)
+    lines = [
+        line.strip()
+        for line in measurement.get_qua_program_as_str().splitlines()]
+    stream = str(measurement._qua_fixed_live_stream)
+    qua_var = str(param.qua_var)
+    assert f"{qua_var} = declare(fixed, )" in lines
+    pause = lines.index("pause()")
+    advance = lines.index(f"advance_input_stream({stream})")
+    assign = lines.index(f"assign({qua_var}, {stream}[0])")
+    assert pause < advance < assign
+    assert f"{measurement.short_name}_fixed_live_stream" in "\n".join(lines)
+
+def test_swept_or_streamed_parameter_can_not_be_live(measurement) -> None:
+    """Tests that live parameters can not be assigned by sweeps or streams"""
+    set_sweeps(measurement)
+    with pytest.raises(ValueError):
+        measurement.add_live_parameter(measurement.v_home_element_a)
+    measurement.input_stream_parameters = [measurement.v_home_element_b]
+    with pytest.raises(ValueError):
+        measurement.add_live_parameter(measurement.v_home_element_b)
+    measurement.input_stream_parameters = []
+
+    ### Sweeps set after the parameter was made live are rejected on generation
+    measurement.add_live_parameter(measurement.v_home_element_c)
+    measurement.set_sweeps(
+        {measurement.v_home_element_c: np.linspace(0, 0.1, 5)})
+    measurement.register_gettables(measurement.atq.gettables[0])
+    with pytest.raises(ValueError):
+        measurement.get_qua_program()
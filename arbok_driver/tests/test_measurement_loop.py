@@ -0,0 +1,103 @@
+"""Module testing the iterative external measurement loop"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+from arbok_driver.measurement_helpers import (
+    _get_setpoint_grid, _run_measurement_loop, create_measurement_loop)
+
+class MockParameter:
+    """Mock qcodes parameter recording all set calls"""
+    def __init__(self, name):
+        self.name = name
+        self.instrument = None
+        self.set_values = []
+
+    def set(self, value):
+        self.set_values.append(value)
+
+class MockCollector:
+    """Mock batch collector returning the batch number"""
+    def __init__(self):
+        self.nr_batches = 0
+
+    def collect(self, progress_bar = None):
+        self.nr_batches += 1
+        return {'gettable': self.nr_batches}
+
+class MockDataSaver:
+    """Mock datasaver recording all results"""
+    def __init__(self):
+        self.results = []
+
+    def add_result(self, *result_args):
+        self.results.append(result_args)
+
+def test_setpoint_grid() -> None:
+    """Tests that the first axis is the outermost one"""
+    outer, inner, concurrent = (MockParameter(n) for n in ('o', 'i', 'c'))
+    nr_points, grid = _get_setpoint_grid([
+        {outer: [0, 1]}, {inner: [10, 20, 30], concurrent: [1, 2, 3]}])
+    assert nr_points == 6
+    assert np.array_equal(grid[outer], [0, 0, 0, 1, 1, 1])
+    assert np.array_equal(grid[inner], [10, 20, 30]*2)
+    assert np.array_equal(grid[concurrent], [1, 2, 3]*2)
+
+def test_loop_only_sets_changed_parameters() -> None:
+    """Tests setting of changed values and pairing of setpoints with batches"""
+    outer, inner = MockParameter('outer'), MockParameter('inner')
+    datasaver = MockDataSaver()
+    progress_tracker = SimpleNamespace(
+        update = lambda *args, **kwargs: None, refresh = lambda: None)
+    sequence = SimpleNamespace(
+        continuous_mode = True, streamed_sweeps = [],
+        batch_collector = MockCollector())
+    _run_measurement_loop(
+        sequence = sequence,
+        datasaver = datasaver,
+        sweep_list = [{outer: [0, 1]}, {inner: [5, 5, 6]}],
+        res_args_dict = {outer: (), inner: ()},
+        progress_bars = {'batch_progress': 0, 'total_progress': 1},
+        progress_tracker = progress_tracker
+        )
+    assert outer.set_values == [0, 1]
+    assert inner.set_values == [5, 6, 5, 6]
+    assert len(datasaver.results) == 6
+    gettable_result, outer_result, inner_result = datasaver.results[4]
+    assert gettable_result == ('gettable', 5)
+    assert outer_result == (outer, 1)
+    assert inner_result == (inner, 5)
+
+def test_live_parameters_are_pushed_before_resume() -> None:
+    """Tests that live parameter values reach the job before each batch"""
+    calls = []
+    qm_job = SimpleNamespace(resume = lambda: calls.append('resume'))
+    progress_tracker = SimpleNamespace(
+        update = lambda *args, **kwargs: None, refresh = lambda: None)
+    sequence = SimpleNamespace(
+        continuous_mode = False,
+        streamed_sweeps = [],
+        live_parameters = ['live_param'],
+        push_live_parameters = lambda: calls.append('push'),
+        driver = SimpleNamespace(qm_job = qm_job),
+        batch_collector = MockCollector()
+        )
+    _run_measurement_loop(
+        sequence = sequence,
+        datasaver = MockDataSaver(),
+        sweep_list = [{MockParameter('outer'): [0, 1]}],
+        res_args_dict = {},
+        progress_bars = {'batch_progress': 0, 'total_progress': 1},
+        progress_tracker = progress_tracker
+        )
+    assert calls == ['push', 'resume']*2
+
+def test_continuous_mode_rejects_external_sweeps() -> None:
+    """Tests that only iterations are swept outside a non-pausing OPX"""
+    iteration = MockParameter('iteration')
+    sequence = SimpleNamespace(
+        continuous_mode = True, driver = SimpleNamespace(iteration = iteration))
+    with pytest.raises(ValueError):
+        create_measurement_loop(
+            sequence, None, [{iteration: [0, 1]}, {MockParameter('v'): [0]}])
+    create_measurement_loop(sequence, None, [{iteration: np.arange(3)}])
@@ -0,0 +1,62 @@
+"""Module testing the parameter lookup of (sub) sequences"""
+import pytest
+
+from arbok_driver import ArbokDriver, Sample, SubSequence
+from arbok_driver.measurement import Measurement
+from arbok_driver.tests.dummy_opx_config import dummy_qua_config
+
+@pytest.fixture
+def measurement():
+    """Returns measurement with element wise parameters and a sub sequence"""
+    sample = Sample('lookup_sample', dummy_qua_config, {})
+    driver = ArbokDriver('lookup_driver', sample)
+    measurement = Measurement(
+        driver, 'lookup_measurement', sample,
+        {'parameters': {'v_home': {'elements': {'E1': 0.1, 'E2': 0.2}}}}
+        )
+    outer = SubSequence(measurement, 'outer', sample)
+    SubSequence(
+        outer, 'inner', sample,
+        {'parameters': {'v_home': {'elements': {'E2': -0.2}}}}
+        )
+    yield measurement
+    driver.close()
+
+def test_measurement_is_cached(measurement) -> None:
+    """Tests that the measurement is found once and then cached"""
+    inner = measurement.outer.inner
+    assert inner.measurement is measurement
+    assert inner.__dict__['_measurement'] is measurement
+
+def test_parameters_are_indexed_by_config_name_and_element(measurement) -> None:
+    """Tests lookup precedence of own parameters over measurement ones"""
+    inner = measurement.outer.inner
+    assert measurement.v_home_E1.element == 'E1'
+    assert inner.find_parameter('v_home', 'E2') is inner.v_home_E2
+    assert inner.find_parameter('v_home', 'E1') is measurement.v_home_E1
+    params = inner.find_parameters_from_keywords('v_home', ['E1', 'E2'])
+    assert params['E2']['v_home'].get() == -0.2
+    assert set(inner.find_parameters('v_home')) == {'E1', 'E2'}
+    with pytest.raises(AttributeError):
+        inner.find_parameter('v_away', 'E1')
+
+@pytest.fixture
+def element_measurement():
+    """Returns measurement with an element wise parameter and a divider"""
+    sample = Sample('element_sample', dummy_qua_config, {'E2': {'division': 4}})
+    driver = ArbokDriver('element_driver', sample)
+    param_config = {'v_home': {
+        'elements': {'E1': 0.1, 'E2': 0.2}, 'label': 'home', 'unit': 'mV'}}
+    measurement = Measurement(
+        driver, 'element_measurement', sample, {'parameters': param_config})
+    yield measurement, param_config
+    driver.close()
+
+def test_element_wise_parameters_share_config(element_measurement) -> None:
+    """Tests scales, labels and overrides of element wise parameters"""
+    measurement, param_config = element_measurement
+    assert measurement.v_home_E1.scale == 1
+    assert measurement.v_home_E2.scale == 4
+    assert measurement.v_home_E2.label == 'E2: home'
+    assert measurement.v_home_E1.unit == 'mV'
+    assert set(param_config['v_home']['elements']) == {'E1', 'E2'}
@@ -0,0 +1,57 @@
+"""Module testing the ParameterSetter class"""
+import threading
+import time
+import pytest
+
+from arbok_driver.parameter_setter import ParameterSetter
+
+class MockInstrument:
+    """Mock instrument"""
+    def __init__(self, name):
+        self.name = name
+
+class SlowParameter:
+    """Mock parameter with a slow setter tracking concurrent calls"""
+    active = {}
+    overlaps = []
+    guard = threading.Lock()
+
+    def __init__(self, name, instrument, fail = False):
+        self.name = name
+        self.root_instrument = instrument
+        self.fail = fail
+        self.value = None
+
+    def set(self, value):
+        with self.guard:
+            self.active.setdefault(self.root_instrument.name, 0)
+            self.active[self.root_instrument.name] += 1
+            self.overlaps.append(dict(self.active))
+        time.sleep(0.05)
+        with self.guard:
+            self.active[self.root_instrument.name] -= 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        self.value = value
+
+def test_instruments_set_concurrently_channels_serialized() -> None:
+    """Tests that only different instruments are set at the same time"""
+    qdac, dmm = MockInstrument('qdac'), MockInstrument('dmm')
+    params = [SlowParameter(f"qdac_ch{i}", qdac) for i in range(3)]
+    params += [SlowParameter(f"dmm_ch{i}", dmm) for i in range(3)]
+    with ParameterSetter(settle_time = 0.01) as setter:
+        setter.set({param: i for i, param in enumerate(params)})
+    assert [param.value for param in params] == list(range(6))
+    assert max(o['qdac'] for o in SlowParameter.overlaps) == 1
+    assert max(o.get('dmm', 0) for o in SlowParameter.overlaps) == 1
+    assert any(o['qdac'] and o.get('dmm') for o in SlowParameter.overlaps)
+
+def test_setter_errors_are_raised() -> None:
+    """Tests that errors are raised after all setters finished"""
+    instruments = [MockInstrument(f"inst{i}") for i in range(2)]
+    failing = SlowParameter('failing', instruments[0], fail = True)
+    working = SlowParameter('working', instruments[1])
+    with ParameterSetter() as setter:
+        with pytest.raises(RuntimeError):
+            setter.set({failing: 1, working: 2})
+    assert working.value == 2
@@ -0,0 +1,124 @@
+"""Module testing the ProgramCache class and the structural hash"""
+import numpy as np
+import pytest
+from qm import qua
+
+from arbok_driver.host_state import HostState
+from arbok_driver.program_cache import ProgramCache
+from arbok_driver.utils import get_structural_hash
+
+def set_sweeps(measurement, length: int) -> None:
+    """Sets a 2D sweep with the given length of the inner axis"""
+    measurement.set_sweeps(
+        {'v_home_element_a': np.linspace(0, 0.1, length)},
+        {'v_home_element_b': np.linspace(0, 0.1, 7)})
+    measurement.register_gettables(measurement.atq.gettables[0])
+
+def test_program_cache_hits_and_misses():
+    cache = ProgramCache()
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert 'a' in cache
+    assert cache.get('a') == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+def test_program_cache_evicts_least_recently_used():
+    cache = ProgramCache(maxsize = 2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+def test_program_cache_disabled():
+    cache = ProgramCache(maxsize = 0)
+    cache.put('a', 1)
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        ProgramCache(maxsize = -1)
+
+def test_structural_hash_is_deterministic():
+    obj = {'sweeps': [('p', np.linspace(0, 1, 5)), True], 'val': 1.5}
+    same = {'sweeps': [('p', np.linspace(0, 1, 5)), True], 'val': 1.5}
+    assert get_structural_hash(obj) == get_structural_hash(same)
+
+def test_structural_hash_detects_changes():
+    base = get_structural_hash([('p', np.arange(5))])
+    assert base != get_structural_hash([('p', np.arange(1, 6))])
+    assert base != get_structural_hash([('p', np.arange(5.))])
+    assert base != get_structural_hash([('p', np.arange(5).reshape(1, 5))])
+    assert get_structural_hash([1]) != get_structural_hash([1.])
+    assert get_structural_hash([[1], 2]) != get_structural_hash([1, [2]])
+
+def test_qua_script_is_memoized_per_program(monkeypatch):
+    from qm import qua
+    from arbok_driver import utils
+    calls = []
+    def generate(program):
+        calls.append(program)
+        return f"script {len(calls)}"
+    monkeypatch.setattr(utils, 'generate_qua_script', generate)
+    with qua.program() as prog_a:
+        pass
+    with qua.program() as prog_b:
+        pass
+    assert utils.get_qua_script(prog_a) == "script 1"
+    assert utils.get_qua_script(prog_a) == "script 1"
+    assert utils.get_qua_script(prog_b) == "script 2"
+    assert calls == [prog_a, prog_b]
+
+def test_rerun_hits_cache_and_restores_qua_variables(measurement):
+    """Tests that reruns hit the cache and get the variables of the program"""
+    set_sweeps(measurement, 10)
+    program_a = measurement.get_qua_program()
+    param = measurement.v_home_element_a
+    qua_vars_a = (param.qua_var, measurement.shot_tracker_qua_var)
+    dummy_var_a = measurement.atq.dummy_var.cache.raw_value
+    ### The read sequence assigns a QUA variable to `dummy_var` on generation
+    assert measurement.get_qua_program() is program_a
+    assert (measurement.program_cache.hits, measurement.program_cache.misses
+            ) == (1, 1)
+
+    set_sweeps(measurement, 11)
+    assert measurement.get_qua_program() is not program_a
+    assert param.qua_var is not qua_vars_a[0]
+
+    set_sweeps(measurement, 10)
+    assert measurement.get_qua_program() is program_a
+    assert measurement.program_cache.hits == 2
+    assert param.qua_var is qua_vars_a[0]
+    assert measurement.shot_tracker_qua_var is qua_vars_a[1]
+    assert measurement.v_home_element_a.qua_sweeped
+    assert measurement.atq.dummy_var.cache.raw_value is dummy_var_a
+
+def test_host_state_only_records_generation_owned_attributes(measurement):
+    """Tests that only QUA variables and streams of the program are recorded"""
+    set_sweeps(measurement, 10)
+    measurement.get_qua_program()
+    _, host_state = measurement.program_cache.get(
+        measurement.get_structural_hash())
+    owned = set(
+        HostState.measurement_attributes + HostState.parameter_attributes
+        + HostState.observable_attributes + HostState.sweep_attributes)
+    recorded = {name for names in host_state.changes.values() for name in names}
+    assert recorded <= owned
+    param = measurement.v_home_element_a
+    param_state = host_state.changes[('parameter', param.full_name)]
+    assert param_state['qua_var'] is param.qua_var
+    dummy_var = measurement.atq.dummy_var
+    assert host_state.parameter_values == {
+        ('parameter', dummy_var.full_name): dummy_var.cache.raw_value}
+
+def test_structural_hash_includes_var_type(measurement):
+    """Tests that changing the QUA type of a parameter changes the hash"""
+    set_sweeps(measurement, 10)
+    structural_hash = measurement.get_structural_hash()
+    measurement.atq.dummy_var.var_type = int
+    assert measurement.get_structural_hash() != structural_hash
+    measurement.atq.dummy_var.var_type = qua.fixed
+    assert measurement.get_structural_hash() == structural_hash
@@ -0,0 +1,100 @@
+"""Module testing the unfolding of snaked sweeps"""
+import itertools
+import math
+import pytest
+import numpy as np
+
+from arbok_driver.utils import get_snake_index_map
+from arbok_driver.tests.helpers import run_qua_script
+
+def acquisition_order(
+        sizes, snaked, odd_batch = False, permutations = None) -> np.ndarray:
+    """Returns the setpoint indices in the order the OPX acquires them"""
+    if permutations is None:
+        permutations = (None,)*len(sizes)
+    order = []
+    def loop(axis, prefix, parent_counter):
+        if axis == len(sizes):
+            order.append(np.ravel_multi_index(prefix, sizes))
+            return
+        if axis == 0:
+            reverse = snaked[0] and odd_batch
+        else:
+            reverse = snaked[axis] and parent_counter % 2 == 1
+        for counter in range(sizes[axis]):
+            index = sizes[axis] - 1 - counter if reverse else counter
+            if permutations[axis] is not None:
+                index = permutations[axis][counter]
+            loop(axis + 1, prefix + [index], counter)
+    loop(0, [], 0)
+    return np.array(order)
+
+@pytest.mark.parametrize("sizes", [(4,), (3, 4), (2, 3, 4), (3, 2, 3, 5)])
+def test_snake_index_map_unfolds_all_snake_combinations(sizes) -> None:
+    """Tests unfolding for any combination of snaked axes"""
+    for snaked in itertools.product([False, True], repeat = len(sizes)):
+        for odd_batch in (False, True):
+            flat_buffer = acquisition_order(sizes, snaked, odd_batch)
+            index_map = get_snake_index_map(
+                sizes, snaked, reverse_outermost = snaked[0] and odd_batch)
+            unfolded = flat_buffer[index_map].reshape(sizes)
+            assert np.array_equal(
+                unfolded, np.arange(np.prod(sizes)).reshape(sizes))
+
+def test_snake_index_map_without_snake_is_identity() -> None:
+    """Tests that unsnaked sweeps result in an identity map"""
+    index_map = get_snake_index_map((3, 5), (False, False))
+    assert np.array_equal(index_map, np.arange(15))
+    with pytest.raises(ValueError):
+        get_snake_index_map((3, 5), (False,))
+
+def test_snake_index_map_unshuffles_permuted_axes() -> None:
+    """Tests unfolding of shuffled axes nested with snaked ones"""
+    rng = np.random.default_rng(1)
+    sizes = (3, 4, 5)
+    for shuffled in itertools.product([False, True], repeat = len(sizes)):
+        permutations = tuple(
+            rng.permutation(size) if shuffle else None
+            for size, shuffle in zip(sizes, shuffled))
+        snaked = (False,) + tuple(not shuffle for shuffle in shuffled[1:])
+        flat_buffer = acquisition_order(
+            sizes, snaked, permutations = permutations)
+        index_map = get_snake_index_map(
+            sizes, snaked, permutations = permutations)
+        unfolded = flat_buffer[index_map].reshape(sizes)
+        assert np.array_equal(
+            unfolded, np.arange(np.prod(sizes)).reshape(sizes))
+
+@pytest.mark.parametrize("snaked", [
+    (False, True), (True, True), (False, True, True), (True, False, True)])
+def test_generated_snake_passes_match_index_map(measurement, snaked):
+    """
+    Tests that the start and step the generated program chooses for each pass
+    of a snaked parameterized sweep visit the setpoints in the order the host
+    unfolds them
+    """
+    sizes = (3, 4, 5)[:len(snaked)]
+    elements = ('element_a', 'element_b', 'element_c')[:len(snaked)]
+    setpoints = [
+        np.linspace(-0.1*(i + 1), 0.05*i, size) for i, size in enumerate(sizes)]
+    params = [getattr(measurement, f"v_home_{e}") for e in elements]
+    measurement.set_sweeps(*(
+        {param: values, 'snake': snake}
+        for param, values, snake in zip(params, setpoints, snaked)))
+    measurement.register_gettables(measurement.atq.gettables[0])
+    assert all(sweep.can_be_parameterized for sweep in measurement.sweeps)
+    script = measurement.get_qua_program_as_str()
+    shot_values = run_qua_script(
+        script, measurement.shot_tracker_qua_var,
+        [param.qua_var for param in params], nr_batches = 2)
+
+    grid = np.stack(np.meshgrid(*setpoints, indexing = 'ij'), axis = -1)
+    nr_shots = math.prod(sizes)
+    assert shot_values.shape == (2*nr_shots, len(sizes))
+    for batch in range(2):
+        index_map = get_snake_index_map(
+            sizes, snaked, reverse_outermost = snaked[0] and batch == 1)
+        batch_values = shot_values[batch*nr_shots:(batch + 1)*nr_shots]
+        assert np.allclose(
+            batch_values[index_map].reshape(grid.shape), grid,
+            rtol = 0, atol = 1e-6)
@@ -0,0 +1,83 @@
+"""Module testing the reduction and binning of result streams on the server"""
+import numpy as np
+import pytest
+from qm import qua, generate_qua_script
+
+from arbok_driver.measurement import Measurement
+from arbok_driver.observable import ObservableBase
+
+@pytest.mark.parametrize('reduction, expected', [
+    ('mean', 'r1.buffer(3, 4).map(FUNCTIONS.average(1)).save("mean")'),
+    ('sum', 'r1.buffer(3, 4).map(FUNCTIONS.average(1)).multiply(4)'),
+    ('var', 'r1.multiply(r1).buffer(3, 4).map(FUNCTIONS.average(1))'),
+])
+def test_qua_reduce_stream(reduction, expected) -> None:
+    """Tests the stream processing generated for the given reduction"""
+    with qua.program() as prog:
+        qua_var = qua.declare(qua.fixed)
+        stream = qua.declare_stream()
+        qua.save(qua_var, stream)
+        with qua.stream_processing():
+            Measurement._qua_reduce_stream(
+                stream, reduction, (3, 4), 1).save(reduction)
+    assert expected in generate_qua_script(prog)
+
+def test_set_reduction(measurement) -> None:
+    """Tests validation of observable reductions"""
+    observable = ObservableBase('dummy', readout = None)
+    axis = measurement.v_home_element_a
+    with pytest.raises(ValueError):
+        observable.set_reduction('median', axis = axis)
+    with pytest.raises(ValueError):
+        observable.set_reduction('mean')
+    with pytest.raises(TypeError):
+        observable.set_reduction('mean', axis = measurement.driver.iteration)
+    observable.set_reduction('var', axis = axis)
+    assert observable.reduction == 'var'
+    observable.set_reduction(None)
+    assert observable.reduction_axis is None
+
+@pytest.mark.parametrize('reduced, kept, axis', [
+    ('element_a', 'element_b', 0), ('element_b', 'element_a', 1)])
+def test_reduced_gettable_drops_axis(measurement, reduced, kept, axis) -> None:
+    """Tests shape, setpoints and stream of a gettable reduced on the server"""
+    ### The first sweep (element_a) is the outermost axis
+    observable = next(iter(
+        measurement.atq.var_readouts['var_readout'].observables.values()))
+    observable.set_reduction(
+        'mean', axis = getattr(measurement, f"v_home_{reduced}"))
+    measurement.set_sweeps(
+        {measurement.v_home_element_a: np.linspace(0, 0.1, 5)},
+        {measurement.v_home_element_b: np.linspace(0, 0.1, 3)})
+    measurement.register_gettables(observable.gettable)
+    gettable = observable.gettable
+    kept_param = getattr(measurement, f"v_home_{kept}")
+    assert gettable.setpoints == (kept_param,)
+    assert gettable.vals.shape == (len(kept_param.get()),)
+    script = measurement.get_qua_program_as_str()
+    assert f'.buffer(5, 3).map(FUNCTIONS.average({axis}))' in script
+
+def test_qua_histogram_stream() -> None:
+    """Tests that only the histogram after the last shot of a batch is kept"""
+    with qua.program() as prog:
+        qua_var = qua.declare(qua.fixed)
+        stream = qua.declare_stream()
+        qua.save(qua_var, stream)
+        with qua.stream_processing():
+            Measurement._qua_histogram_stream(
+                stream, np.array([-1., 0., 1.]), 10).save('hist')
+    script = generate_qua_script(prog)
+    assert '.histogram([[-1.0, 0.0], [0.0, 1.0]])' in script
+    assert '.skip(9).buffer_and_skip(1, 10).save("hist")' in script
+
+def test_set_histogram(measurement) -> None:
+    """Tests bin edges from callables and validation of the edges"""
+    observable = ObservableBase('dummy', readout = None)
+    observable.set_reduction('mean', axis = measurement.v_home_element_a)
+    observable.set_histogram([lambda: -1., 0., lambda: 2.])
+    assert observable.reduction is None
+    assert np.array_equal(observable.bin_edges, [-1., 0., 2.])
+    observable.set_histogram(lambda: np.linspace(0, 1, 5))
+    assert observable.bin_edges.size == 5
+    with pytest.raises(ValueError):
+        observable.set_histogram([1., 0.])
@@ -0,0 +1,193 @@
+"""Module testing the closed-form parameterization of sweeps"""
+import numpy as np
+import pytest
+from qm import qua
+
+from arbok_driver.sweep import Sweep
+from arbok_driver.utils import FIXED_RESOLUTION, quantize_fixed
+from arbok_driver.tests.helpers import run_qua_script
+
+def mock_sweep(config: dict) -> Sweep:
+    """Returns a sweep with the given config without a measurement"""
+    sweep = Sweep.__new__(Sweep)
+    sweep.parameterization_errors = {}
+    sweep.geometric_parameters = {}
+    sweep._config_to_register = dict(config)
+    sweep._config = config
+    sweep._parameters = list(config)
+    sweep._inputs_are_streamed = False
+    sweep._length = len(next(iter(config.values())))
+    return sweep
+
+class MockParameter:
+    """Mock sequence parameter"""
+    def __init__(self, var_type = qua.fixed, scale = 1):
+        self.var_type = var_type
+        self.scale = scale
+        self.can_be_parameterized = None
+
+    def convert_to_real_units(self, value):
+        return value
+
+def get_longest_parameterized(get_setpoints, max_length: int) -> np.ndarray:
+    """Returns the longest setpoints up to `max_length` that are parameterized"""
+    for length in range(max_length, 1, -1):
+        setpoints = get_setpoints(length)
+        if mock_sweep({MockParameter(): setpoints})._check_if_parametrizable():
+            return setpoints
+    raise ValueError("No parameterized sweep found")
+
+def test_quantize_fixed():
+    assert quantize_fixed(0.1) == round(0.1/FIXED_RESOLUTION)*FIXED_RESOLUTION
+    assert np.all(np.abs(quantize_fixed(np.linspace(-1, 1, 7))
+        - np.linspace(-1, 1, 7)) <= FIXED_RESOLUTION/2)
+
+@pytest.mark.parametrize('setpoints', [
+    np.linspace(-0.1, 0.1, 30), np.linspace(0.5, -0.3, 101), np.array([0.2])])
+def test_fixed_sweep_error_is_bounded(setpoints):
+    param = MockParameter()
+    sweep = mock_sweep({param: setpoints})
+    start, stop, step, max_error = sweep._fit_sweep_array(param, setpoints)
+    assert start == quantize_fixed(start)
+    assert step == quantize_fixed(step)
+    assert stop == start + step*(len(setpoints) - 1)
+    assert max_error <= len(setpoints)*FIXED_RESOLUTION
+    assert sweep._check_if_parametrizable()
+
+def test_int_sweep_is_exact():
+    param = MockParameter(int)
+    setpoints = np.arange(16, 400, 12)
+    sweep = mock_sweep({param: setpoints})
+    start, stop, step, max_error = sweep._fit_sweep_array(param, setpoints)
+    assert (start, stop, step, max_error) == (16, 388, 12, 0)
+
+def test_irregular_sweep_falls_back_to_array():
+    param = MockParameter()
+    setpoints = np.array([0., 0.1, 0.25, 0.3])
+    sweep = mock_sweep({param: setpoints})
+    assert not sweep._check_if_parametrizable()
+    assert param.can_be_parameterized is False
+    assert sweep.parameterization_errors[param] == pytest.approx(0.05)
+
+def test_parameterizability_is_memoized(monkeypatch):
+    param = MockParameter()
+    sweep = mock_sweep({param: np.array([0., 0.1, 0.19, 0.3])})
+    checks = []
+    check = sweep._check_if_parametrizable
+    monkeypatch.setattr(
+        sweep, '_check_if_parametrizable', lambda: checks.append(1) or check())
+    assert not sweep.can_be_parameterized
+    assert not sweep.can_be_parameterized
+    assert len(checks) == 1
+    sweep.parameterization_tolerance = 0.2
+    assert sweep.can_be_parameterized
+    assert param.can_be_parameterized
+    assert len(checks) == 2
+    with pytest.raises(ValueError):
+        sweep.parameterization_tolerance = -1
+
+def test_sweep_exceeding_fixed_range_falls_back_to_array():
+    param = MockParameter(scale = 100)
+    sweep = mock_sweep({param: np.linspace(0, 0.1, 11)})
+    assert not sweep._check_if_parametrizable()
+    assert sweep.parameterization_errors[param] == np.inf
+
+@pytest.mark.parametrize('var_type, setpoints', [
+    (qua.fixed, np.geomspace(1e-3, 0.5, 40)),
+    (qua.fixed, -np.logspace(-2, 0, 9)),
+    (int, np.geomspace(16, 40000, 25).round()),
+    ])
+def test_geometric_sweep_matches_host_setpoints(var_type, setpoints):
+    param = MockParameter(var_type)
+    sweep = mock_sweep({param: setpoints})
+    assert sweep._check_if_parametrizable()
+    sss = sweep.geometric_parameters[param]
+    accumulator = [sss['start']]
+    for _ in range(len(setpoints) - 1):
+        value = accumulator[-1]*sss['ratio']
+        accumulator.append(np.floor(value/FIXED_RESOLUTION)*FIXED_RESOLUTION)
+    opx_setpoints = np.array(accumulator)
+    if var_type == int:
+        opx_setpoints = np.trunc(opx_setpoints*sss['scale'])
+    assert np.all(np.abs(accumulator) < 8)
+    assert np.array_equal(sweep.config_to_register[param], opx_setpoints)
+    assert sss['stop'] == opx_setpoints[-1]
+
+def test_snaked_geometric_sweep_falls_back_to_array():
+    param = MockParameter()
+    sweep = mock_sweep({param: np.geomspace(1e-3, 0.5, 40)})
+    sweep.snake_scan = True
+    assert not sweep._check_if_parametrizable()
+    assert not sweep.geometric_parameters
+
+def test_shuffled_sweep_is_not_geometric():
+    param = MockParameter()
+    sweep = mock_sweep({param: np.geomspace(1e-3, 0.5, 40)})
+    sweep.snake_scan = False
+    sweep._configure_shuffle(3)
+    assert sorted(sweep.permutation) == list(range(40))
+    assert not sweep._check_if_parametrizable()
+    sweep.snake_scan = True
+    with pytest.raises(ValueError):
+        sweep._configure_shuffle(3)
+
+def test_sweep_array_sources():
+    base, copy, scaled, squared = (MockParameter() for _ in range(4))
+    base_array = np.array([-0.08, -0.05, 0.01, 0.03, 0.07])
+    sweep = mock_sweep({base: base_array})
+    assert sweep._fit_sweep_array_source(
+        copy, base_array, base, base_array) == (1, 0)
+    factor, offset = sweep._fit_sweep_array_source(
+        scaled, 0.5*base_array + 0.01, base, base_array)
+    assert factor == 0.5
+    assert offset == pytest.approx(0.01, abs = FIXED_RESOLUTION)
+    assert sweep._fit_sweep_array_source(
+        squared, base_array**2, base, base_array) is None
+
+def test_int_sweep_array_sources_are_exact():
+    base, scaled = MockParameter(int), MockParameter(int)
+    base_array = np.array([3, 7, 8, 20])
+    sweep = mock_sweep({base: base_array})
+    assert sweep._fit_sweep_array_source(
+        scaled, 4*base_array - 2, base, base_array) == (4, -2)
+    assert sweep._fit_sweep_array_source(
+        scaled, base_array//2, base, base_array) is None
+    assert sweep._fit_sweep_array_source(
+        MockParameter(), base_array, base, base_array) is None
+
+@pytest.mark.parametrize('get_setpoints, max_length, is_geometric', [
+    (lambda length: np.linspace(-0.3, 0.47, length), 8000, False),
+    (lambda length: np.geomspace(1e-3, 0.5, length), 700, True),
+    ])
+def test_generated_accumulator_drift_is_bounded(
+        measurement, get_setpoints, max_length, is_geometric):
+    """
+    Tests that the values the generated program accumulates in 4.28 fixed
+    point stay within the parameterization tolerance of the configured array
+    for the longest sweep that is still parameterized
+    """
+    setpoints = get_longest_parameterized(get_setpoints, max_length)
+    assert len(setpoints) < max_length
+    param = measurement.v_home_element_a
+    measurement.set_sweeps({param: setpoints})
+    measurement.register_gettables(measurement.atq.gettables[0])
+    sweep = measurement.sweeps[0]
+    assert sweep.can_be_parameterized
+    assert (param in sweep.geometric_parameters) == is_geometric
+    registered = sweep.config_to_register[param]
+    tolerance = sweep.parameterization_tolerance
+    script = measurement.get_qua_program_as_str()
+    values = run_qua_script(
+        script, measurement.shot_tracker_qua_var, [param.qua_var])[:, 0]
+
+    ### Deviations are bounded by the local step as in the host side check
+    local_steps = np.abs(np.diff(
+        setpoints, append = setpoints[-1]**2/setpoints[-2] if is_geometric
+        else 2*setpoints[-1] - setpoints[-2]))
+    bound = np.maximum(tolerance*local_steps, FIXED_RESOLUTION)
+    assert values.shape == setpoints.shape
+    assert np.all(np.abs(values - setpoints) <= bound)
+    if is_geometric:
+        assert np.array_equal(values, registered)
+    else:
+        assert np.array_equal(registered, setpoints)
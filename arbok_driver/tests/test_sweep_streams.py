@@ -0,0 +1,87 @@
+"""Module testing chunked input stream sweeps"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+class MockShotCounter:
+    """
+    Mock shot counter of an OPX that measures one shot per poll and waits at
+    the first shot of a chunk of a streamed parameter that is not inserted
+    """
+    def __init__(self, inserted: list, first_shots: list, nr_shots: float):
+        self.inserted = inserted
+        self.first_shots = first_shots
+        self.nr_shots = nr_shots
+        self.shot_count = 0
+
+    def fetch_all(self):
+        limit = self.nr_shots
+        if len(self.inserted) < len(self.first_shots):
+            limit = self.first_shots[len(self.inserted)]
+        self.shot_count = min(self.shot_count + 1, limit)
+        return np.array([self.shot_count])
+
+def set_chunked_sweeps(measurement) -> list:
+    """
+    Sweeps element_a over 5 setpoints in chunks of 2 inside an unchunked sweep
+    of element_b over 4 setpoints and attaches a mock job recording all
+    inserted chunks
+    """
+    measurement.set_sweeps(
+        {measurement.v_home_element_a: np.linspace(0, 1, 5), 'chunk_size': 2},
+        {measurement.v_home_element_b: np.arange(4.)})
+    measurement.sweep_stream_poll_interval = 1e-4
+    inserted = []
+    measurement.driver.qm_job = SimpleNamespace(
+        insert_input_stream = lambda name, data: inserted.append((name, data)),
+        result_handles = SimpleNamespace(**{
+            f"{measurement.name}_shots": MockShotCounter(inserted, [], np.inf)
+            })
+        )
+    return inserted
+
+def test_stream_chunks_are_padded(measurement):
+    param = measurement.v_home_element_a
+    measurement.set_sweeps(
+        {param: np.linspace(0, 0.6, 7), 'chunk_size': 3})
+    sweep = measurement.sweeps[0]
+    assert sweep.nr_chunks == 3
+    chunks = sweep.get_stream_chunks(param)
+    assert np.allclose(chunks, [[0, 0.1, 0.2], [0.3, 0.4, 0.5], [0.6]*3])
+
+def test_chunks_are_repeated_for_outer_sweeps(measurement):
+    inserted = set_chunked_sweeps(measurement)
+    measurement.feed_sweep_streams().result()
+    names = {name for name, _ in inserted}
+    assert names == {measurement.v_home_element_a.sequence_path}
+    data = [value for _, chunk in inserted for value in chunk]
+    assert len(inserted) == 4*3
+    assert data[:6] == pytest.approx([0, 0.25, 0.5, 0.75, 1, 1])
+    assert data[6:12] == data[:6]
+
+def test_chunk_inserts_are_paced_by_shot_counter(measurement):
+    inserted = set_chunked_sweeps(measurement)
+    measurement.max_pending_sweep_chunks = 2
+    first_shots = [5*rep + 2*j for rep in range(4) for j in range(3)]
+    shot_counter = MockShotCounter(inserted, first_shots, 20)
+    qm_job = measurement.driver.qm_job
+    setattr(qm_job.result_handles, f"{measurement.name}_shots", shot_counter)
+    nr_pending = []
+    def insert_input_stream(name, data):
+        inserted.append((name, data))
+        shot_count = shot_counter.shot_count
+        nr_advanced = sum(1 for shot in first_shots if shot < shot_count)
+        nr_pending.append(len(inserted) - nr_advanced)
+    qm_job.insert_input_stream = insert_input_stream
+    measurement.feed_sweep_streams().result(timeout = 5)
+    assert len(inserted) == 12
+    assert max(nr_pending) == 2
+
+def test_stream_is_dropped_when_sweep_is_not_chunked(measurement):
+    param = measurement.v_home_element_a
+    measurement.set_sweeps(
+        {param: np.linspace(0, 0.1, 10), 'chunk_size': 4})
+    assert (param.input_stream, param.input_stream_size) == (True, 4)
+    measurement.set_sweeps({param: np.linspace(0, 0.1, 10)})
+    assert (param.input_stream, param.input_stream_size) == (None, None)
+    assert not measurement.sweeps[0].inputs_are_streamed
@@ -0,0 +1,89 @@
+"""Module testing the WaitStrategy classes"""
+import numpy as np
+
+from arbok_driver.wait_strategy import (
+    BackoffWaitStrategy, BlockingWaitStrategy, ContinuousBatchCounter
+)
+
+class MockCounter:
+    """Mock shot counter increasing by a fixed amount on each fetch"""
+    def __init__(self, increment: int):
+        self.increment = increment
+        self.count = 0
+
+    def fetch_all(self):
+        self.count += self.increment
+        return np.array([self.count])
+
+class MockJob:
+    """Mock qm job that counts calls to `is_paused`"""
+    def __init__(self):
+        self.nr_pause_checks = 0
+
+    def is_paused(self):
+        self.nr_pause_checks += 1
+        return True
+
+def test_backoff_wait_strategy_counts_polls() -> None:
+    """Tests that polls are counted per batch and pause is checked once"""
+    strategy = BackoffWaitStrategy(max_poll_rate = 0, initial_interval = 0)
+    job = MockJob()
+    batch_count = strategy.wait(MockCounter(25), job, batch_size = 100)
+    assert batch_count == 100
+    assert strategy.poll_counts == [4]
+    assert job.nr_pause_checks == 1
+    strategy.wait(MockCounter(50), job, batch_size = 100)
+    assert strategy.poll_counts == [4, 2]
+    assert strategy.last_poll_count == 2
+    assert strategy.total_poll_count == 6
+    strategy.reset_counters()
+    assert strategy.poll_counts == []
+
+def test_backoff_interval_grows_without_progress() -> None:
+    """Tests exponential growth of the interval and its upper bound"""
+    strategy = BackoffWaitStrategy(
+        initial_interval = 1e-3, backoff_factor = 2, max_interval = 5e-3)
+    strategy.start_batch(100)
+    assert strategy.next_interval(0, 100) == 2e-3
+    assert strategy.next_interval(0, 100) == 4e-3
+    assert strategy.next_interval(0, 100) == 5e-3
+    assert strategy.next_interval(10, 100) == 1e-3
+
+def test_backoff_interval_tuned_by_time_per_shot() -> None:
+    """Tests that the interval follows the predicted remaining time"""
+    strategy = BackoffWaitStrategy(initial_interval = 1e-3, max_interval = 1)
+    strategy.start_batch(100)
+    strategy.ms_per_shot = 2
+    assert np.isclose(strategy.next_interval(50, 100), 0.05)
+
+def test_max_poll_rate() -> None:
+    """Tests the minimum interval derived from the maximum poll rate"""
+    assert BackoffWaitStrategy(max_poll_rate = 20).min_interval == 0.05
+    assert BackoffWaitStrategy(max_poll_rate = 0).min_interval == 0
+
+def test_blocking_wait_strategy_initial_interval() -> None:
+    """Tests that the blocking waiter blocks for the expected batch time"""
+    strategy = BlockingWaitStrategy(headroom = 0.5)
+    assert strategy.initial_interval(100) == 0
+    strategy.ms_per_shot = 1
+    assert np.isclose(strategy.initial_interval(100), 0.05)
+
+class MockBatchCounter:
+    """Mock `save_all` batch counter with a fixed number of saved batches"""
+    def __init__(self, nr_batches: int):
+        self.nr_batches = nr_batches
+
+    def count_so_far(self):
+        return self.nr_batches
+
+def test_continuous_batch_counter() -> None:
+    """Tests that completed batches are detected by their index"""
+    counter = ContinuousBatchCounter(
+        MockCounter(10), MockBatchCounter(2), batch_size = 100)
+    assert counter.fetch_all()[0] == 100
+    counter.batch_index = 2
+    assert counter.fetch_all()[0] == 10
+    strategy = BackoffWaitStrategy(max_poll_rate = 0, initial_interval = 0)
+    counter.batch_index = 1
+    assert strategy.wait(
+        counter, None, batch_size = 100, wait_for_pause = False) == 100
@@ -1,13 +1,37 @@
 """Module containing various utils"""
+import hashlib
 import logging
+import weakref
 import matplotlib.pyplot as plt
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from qcodes.instrument import Instrument
 from qcodes.station import Station
+from qm import generate_qua_script
 from importlib.util import spec_from_file_location, module_from_spec
 
+FIXED_RESOLUTION = 2**-28
+FIXED_RANGE = 8.
+
+_qua_scripts = weakref.WeakKeyDictionary()
+
+def get_qua_script(qua_program) -> str:
+    """
+    Returns the QUA script of the given program. The script is only generated
+    on the first call and memoized for the lifetime of the program
+
+    Args:
+        qua_program (Program): QUA program to be serialized
+
+    Returns:
+        str: QUA script of the program
+    """
+    if qua_program not in _qua_scripts:
+        logging.debug("Generating QUA script for program %s", id(qua_program))
+        _qua_scripts[qua_program] = generate_qua_script(qua_program)
+    return _qua_scripts[qua_program]
+
 def plot_qmm_simulation_results(simulated_samples):
     """ 
     Visualizes analog and digital channel simulation results 
@@ -224,4 +248,129 @@ def get_module(name: str = None, mod_path: str = None):
         raise ImportError(f"Cannot create module spec for {mod_path}.")
     mod = module_from_spec(spec)
     spec.loader.exec_module(mod)
-    return mod
\ No newline at end of file
+    return mod
+
+
+def get_snake_index_map(
+        sizes: tuple[int, ...],
+        snaked: tuple[bool, ...],
+        reverse_outermost: bool = False,
+        permutations: tuple | None = None
+        ) -> np.ndarray:
+    """
+    Computes the flat index map that unfolds a flat OPX buffer of a (snaked
+    or shuffled) sweep into the shape given by `sizes`. Axes are ordered from
+    the outermost to the innermost loop. A snaked axis runs backwards whenever
+    the loop counter of its parent axis is odd. A shuffled axis visits the
+    setpoint `permutation[counter]` at loop counter `counter`. With
+    `out = buffer[index_map]` the reshaped result is `out.reshape(sizes)`.
+
+    Args:
+        sizes (tuple): Lengths of the sweep axes (outermost first)
+        snaked (tuple): Whether the respective axis is snaked
+        reverse_outermost (bool): Whether the outermost axis runs backwards.
+            A snaked outermost axis alternates its direction each batch
+        permutations (tuple, optional): Setpoint order of each axis or None
+            for axes that are not shuffled
+
+    Returns:
+        np.ndarray: Flat index array of length prod(sizes)
+    """
+    if len(sizes) != len(snaked):
+        raise ValueError(
+            f"sizes {sizes} and snaked {snaked} must have the same length")
+    if permutations is None:
+        permutations = (None,)*len(sizes)
+    setpoint_indices = np.indices(sizes, dtype = np.intp, sparse = True)
+    loop_counters = []
+    for axis, (size, snake) in enumerate(zip(sizes, snaked)):
+        index = setpoint_indices[axis]
+        if permutations[axis] is not None:
+            ### Loop counter at which each setpoint is visited
+            index = np.argsort(permutations[axis])[index]
+        if axis == 0:
+            reverse = reverse_outermost
+        elif snake:
+            reverse = loop_counters[-1] % 2 == 1
+        else:
+            reverse = False
+        loop_counters.append(np.where(reverse, size - 1 - index, index))
+    loop_counters = np.broadcast_arrays(*loop_counters)
+    return np.ravel_multi_index(loop_counters, sizes).ravel()
+
+def quantize_fixed(value: float | np.ndarray) -> float | np.ndarray:
+    """
+    Rounds the given value(s) to the resolution of the 4.28 fixed point
+    format of `qua.fixed` variables on the OPX
+
+    Args:
+        value (float | np.ndarray): Value(s) to be quantized
+
+    Returns:
+        float | np.ndarray: Quantized value(s)
+    """
+    quantized = np.round(np.asarray(value, dtype = float)/FIXED_RESOLUTION)
+    quantized *= FIXED_RESOLUTION
+    if quantized.ndim == 0:
+        return float(quantized)
+    return quantized
+
+def get_nr_packed_words(nr_bits: int) -> int:
+    """Number of 32-bit words needed to pack the given number of bits"""
+    return -(-nr_bits//32)
+
+def unpack_bits(words: np.ndarray, nr_bits: int) -> np.ndarray:
+    """
+    Unpacks bools that were packed into 32-bit integers on the FPGA. Bit `n`
+    is stored in bit `n % 32` of word `n // 32`. Negative words (bit 31 set)
+    are interpreted as their unsigned two's complement.
+
+    Args:
+        words (np.ndarray): Flat array of packed words
+        nr_bits (int): Number of packed bits
+
+    Returns:
+        np.ndarray: Flat bool array of length `nr_bits`
+    """
+    words = np.asarray(words).astype(np.int64) & 0xFFFFFFFF
+    packed_bytes = words.astype('<u4').view(np.uint8)
+    bits = np.unpackbits(packed_bytes, count = nr_bits, bitorder = 'little')
+    return bits.view(bool)
+
+def get_structural_hash(obj) -> str:
+    """
+    Computes a hash of nested dicts, lists, tuples, numpy arrays and scalars.
+    Arrays are hashed by their dtype, shape and raw data. Other objects are
+    hashed by their type and `repr`.
+
+    Args:
+        obj (any): Object to be hashed
+
+    Returns:
+        str: Hex digest of the structural hash
+    """
+    digest = hashlib.sha256()
+    _update_structural_hash(digest, obj)
+    return digest.hexdigest()
+
+def _update_structural_hash(digest, obj) -> None:
+    """Recursively feeds the given object into the hash digest"""
+    if isinstance(obj, dict):
+        digest.update(b'{')
+        for key, value in obj.items():
+            _update_structural_hash(digest, key)
+            _update_structural_hash(digest, value)
+        digest.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'[')
+        for value in obj:
+            _update_structural_hash(digest, value)
+        digest.update(b']')
+    elif isinstance(obj, np.ndarray):
+        digest.update(f"ndarray{obj.dtype.str}{obj.shape}".encode())
+        if obj.dtype.hasobject:
+            _update_structural_hash(digest, obj.tolist())
+        else:
+            digest.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        digest.update(f"{type(obj).__qualname__}:{obj!r};".encode())
@@ -0,0 +1,275 @@
+""" Module containing strategies to wait for OPX batches to complete """
+from abc import ABC, abstractmethod
+import time
+import logging
+
+import numpy as np
+
+class WaitStrategy(ABC):
+    """
+    Base class for strategies that wait until the OPX has completed a batch.
+    The base class runs the poll loop and keeps track of the polling
+    statistics. Child classes only decide how long to sleep between two
+    consecutive polls via `next_interval`.
+
+    Attributes:
+        max_poll_rate (float): Maximum amount of polls per second (Hz). Values
+            smaller or equal to zero disable the limit
+        poll_counts (list): Number of polls each completed batch needed
+        ms_per_shot (float): Observed time per shot of the last batch in ms
+        batch_durations (list): Duration in s of each completed batch
+    """
+    def __init__(self, max_poll_rate: float = 50.):
+        """
+        Constructor method of `WaitStrategy`
+
+        Args:
+            max_poll_rate (float, optional): Maximum amount of polls per second
+                sent to the QM server. Defaults to 50 Hz
+        """
+        self.max_poll_rate = max_poll_rate
+        self.poll_counts = []
+        self.batch_durations = []
+        self.ms_per_shot = None
+
+    @property
+    def min_interval(self) -> float:
+        """Minimum time in s between two polls given by `max_poll_rate`"""
+        if self.max_poll_rate is None or self.max_poll_rate <= 0:
+            return 0.
+        return 1./self.max_poll_rate
+
+    @property
+    def last_poll_count(self) -> int | None:
+        """Number of polls the last completed batch needed"""
+        if not self.poll_counts:
+            return None
+        return self.poll_counts[-1]
+
+    @property
+    def total_poll_count(self) -> int:
+        """Number of polls over all completed batches"""
+        return sum(self.poll_counts)
+
+    def reset_counters(self) -> None:
+        """Resets all polling statistics"""
+        self.poll_counts = []
+        self.batch_durations = []
+        self.ms_per_shot = None
+
+    def wait(
+            self,
+            batch_counter,
+            qm_job,
+            batch_size: int,
+            on_poll: callable = None,
+            wait_for_pause: bool = True
+            ) -> int:
+        """
+        Blocks until `batch_counter` reports `batch_size` completed shots and
+        the job has reached its `qua.pause` statement.
+
+        Args:
+            batch_counter (StreamingResultFetcher): Result handle of the
+                shot counter of the measurement
+            qm_job (RunningQmJob): Running job to check for pause
+            batch_size (int): Number of shots in one batch
+            on_poll (callable, optional): Called after each poll with the
+                current shot count and the time per shot in ms
+            wait_for_pause (bool, optional): Whether the job has to be paused
+                for the batch to be complete. Defaults to True
+
+        Returns:
+            int: Number of shots counted in the batch
+        """
+        batch_count, nr_polls = 0, 0
+        t0 = time.time()
+        self.start_batch(batch_size)
+        self._sleep(self.initial_interval(batch_size))
+        try:
+            while True:
+                nr_polls += 1
+                shot_count_result = batch_counter.fetch_all()
+                if shot_count_result is not None:
+                    batch_count = int(shot_count_result[0])
+                elapsed = time.time() - t0
+                if batch_count > 0:
+                    self.ms_per_shot = 1e3*elapsed/batch_count
+                if on_poll is not None:
+                    on_poll(batch_count, self.ms_per_shot)
+                logging.debug(
+                    "Waiting for batch (%s/%s), poll %s",
+                    batch_count, batch_size, nr_polls)
+                if batch_count >= batch_size:
+                    if not wait_for_pause or qm_job.is_paused():
+                        break
+                self._sleep(self.next_interval(batch_count, batch_size))
+        except KeyboardInterrupt as exc:
+            raise KeyboardInterrupt('Measurement interrupted by user') from exc
+        self.poll_counts.append(nr_polls)
+        self.batch_durations.append(time.time() - t0)
+        return batch_count
+
+    def start_batch(self, batch_size: int) -> None:
+        """Hook that is called before waiting for a new batch"""
+
+    def initial_interval(self, batch_size: int) -> float:
+        """Time in s to sleep before the first poll of a batch"""
+        return 0.
+
+    @abstractmethod
+    def next_interval(self, batch_count: int, batch_size: int) -> float:
+        """
+        Returns the time in s to sleep before the next poll
+
+        Args:
+            batch_count (int): Shots counted at the last poll
+            batch_size (int): Number of shots in one batch
+        """
+
+    def _sleep(self, interval: float) -> None:
+        """Sleeps for the given interval, but at least for `min_interval`"""
+        interval = max(interval, self.min_interval)
+        if interval > 0:
+            time.sleep(interval)
+
+class BackoffWaitStrategy(WaitStrategy):
+    """
+    Polls with an exponentially growing interval while no new shots arrive.
+    As soon as a time per shot is known, the interval is tuned to half the
+    predicted remaining time of the batch, which converges to the end of the
+    batch in a logarithmic number of polls.
+    """
+    def __init__(
+            self,
+            max_poll_rate: float = 50.,
+            initial_interval: float = 1e-3,
+            backoff_factor: float = 2.,
+            max_interval: float = 1.
+            ):
+        """
+        Constructor method of `BackoffWaitStrategy`
+
+        Args:
+            max_poll_rate (float, optional): Maximum amount of polls per second
+            initial_interval (float, optional): First interval in s
+            backoff_factor (float, optional): Factor by which the interval grows
+                if no progress was made between two polls
+            max_interval (float, optional): Upper bound of the interval in s
+        """
+        super().__init__(max_poll_rate)
+        self.start_interval = initial_interval
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval
+        self._interval = initial_interval
+        self._last_count = 0
+
+    def start_batch(self, batch_size: int) -> None:
+        """Resets the backoff at the start of each batch"""
+        self._interval = self.start_interval
+        self._last_count = 0
+
+    def next_interval(self, batch_count: int, batch_size: int) -> float:
+        """Exponential backoff bounded by the predicted remaining batch time"""
+        if batch_count > self._last_count:
+            self._interval = self.start_interval
+        else:
+            self._interval *= self.backoff_factor
+        self._last_count = batch_count
+        interval = self._interval
+        if self.ms_per_shot is not None and batch_count < batch_size:
+            remaining = 1e-3*self.ms_per_shot*(batch_size - batch_count)
+            interval = max(interval, remaining/2)
+        return min(interval, self.max_interval)
+
+class BlockingWaitStrategy(BackoffWaitStrategy):
+    """
+    Blocks for the expected duration of a batch before polling the first time.
+    The expected duration is taken from the previous batch. The QM API does
+    not push notifications on result streams, so the remaining time is covered
+    by the exponential backoff of `BackoffWaitStrategy`.
+    """
+    def __init__(self, *args, headroom: float = 0.95, **kwargs):
+        """
+        Constructor method of `BlockingWaitStrategy`
+
+        Args:
+            headroom (float, optional): Fraction of the expected batch duration
+                to block before the first poll. Defaults to 0.95
+            *args: Arguments for `BackoffWaitStrategy`
+            **kwargs: Keyword arguments for `BackoffWaitStrategy`
+        """
+        super().__init__(*args, **kwargs)
+        self.headroom = headroom
+
+    def initial_interval(self, batch_size: int) -> float:
+        """Expected duration of the batch from the time per shot"""
+        if self.ms_per_shot is None:
+            return 0.
+        return self.headroom*1e-3*self.ms_per_shot*batch_size
+
+class ContinuousBatchCounter:
+    """
+    Shot counter for measurements in continuous mode, in which the OPX never
+    pauses. Reports a full batch once the batch with index `batch_index` was
+    saved to the `<measurement>_batches` stream and the shot count of the
+    running batch otherwise. Can be passed to `WaitStrategy.wait` in place of
+    the shot counter.
+    """
+    def __init__(self, shot_counter, batch_counter, batch_size: int):
+        """
+        Constructor method of ContinuousBatchCounter
+
+        Args:
+            shot_counter (StreamingResultFetcher): `<measurement>_shots` handle
+            batch_counter (StreamingResultFetcher): `<measurement>_batches`
+                handle saved with `save_all`
+            batch_size (int): Number of shots in one batch
+        """
+        self.shot_counter = shot_counter
+        self.batch_counter = batch_counter
+        self.batch_size = batch_size
+        self.batch_index = 0
+
+    def fetch_all(self) -> np.ndarray | None:
+        """Returns the shot count of the batch with index `batch_index`"""
+        if self.batch_counter.count_so_far() > self.batch_index:
+            return np.array([self.batch_size])
+        return self.shot_counter.fetch_all()
+
+def progress_bar_callback(
+        progress_bar: tuple | None,
+        batch_size: int,
+        nr_registered_results: int = 0
+        ) -> callable:
+    """
+    Creates an `on_poll` callback for `WaitStrategy.wait` that updates the
+    given rich progress bar with the batch progress and shot timing
+
+    Args:
+        progress_bar (tuple | None): Tuple of the task id and the rich
+            `Progress` instance. If None, the callback does nothing
+        batch_size (int): Number of shots in one batch
+        nr_registered_results (int): Results registered in previous batches
+
+    Returns:
+        callable: Callback taking the shot count and the time per shot in ms
+    """
+    def update_progress_bar(batch_count: int, ms_per_shot: float | None):
+        """Updates the progress bar after each poll of the wait strategy"""
+        if progress_bar is None:
+            return
+        bar_title = "[cyan]Batch progress "
+        bar_title += f"{batch_count}/{batch_size}\n"
+        if ms_per_shot is None:
+            shot_timing = "Calculate timing...\n"
+        else:
+            shot_timing = f"{ms_per_shot:.1f} ms per shot\n"
+        total_results = f"Total results: {batch_count + nr_registered_results}"
+        progress_bar[1].update(
+            progress_bar[0],
+            completed = batch_count,
+            description = bar_title + shot_timing + total_results
+        )
+        progress_bar[1].refresh()
+    return update_progress_bar
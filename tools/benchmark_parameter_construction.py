@@ -0,0 +1,45 @@
+"""
+Benchmarks the construction of a measurement with many element wise
+parameters, similar to a master config of a large device.
+
+Usage:
+    python tools/benchmark_parameter_construction.py [nr_gates] [nr_params]
+"""
+import copy
+import sys
+import timeit
+
+from arbok_driver import ArbokDriver, Sample
+from arbok_driver.measurement import Measurement
+from arbok_driver.parameter_types import Voltage
+from arbok_driver.tests.dummy_opx_config import dummy_qua_config
+
+def main(nr_gates: int = 40, nr_params: int = 5, repeat: int = 20) -> None:
+    """Prints the fastest construction time of the measurement"""
+    config = copy.deepcopy(dummy_qua_config)
+    gates = [f"P{i}" for i in range(nr_gates)]
+    for gate in gates:
+        config['elements'][gate] = config['elements']['E1']
+    divider_config = {gate: {'division': 2} for gate in gates[::2]}
+    sample = Sample('benchmark_sample', config, divider_config)
+    driver = ArbokDriver('benchmark_driver', sample)
+    parameters = {
+        f"v_point_{i}": {
+            'type': Voltage, 'elements': {gate: 0.01*i for gate in gates}}
+        for i in range(nr_params)
+        }
+    configs = [
+        {'parameters': copy.deepcopy(parameters)} for _ in range(repeat)]
+
+    def construct():
+        return Measurement(
+            driver, f"benchmark_{len(configs)}", sample, configs.pop())
+
+    times = timeit.repeat(construct, number = 1, repeat = repeat)
+    print(
+        f"{nr_gates} gates x {nr_params} element wise parameters: "
+        f"{min(times)*1e3:.1f} ms (best of {repeat})")
+    driver.close()
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))